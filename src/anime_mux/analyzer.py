@@ -1,5 +1,7 @@
 """Analyzer module - combines discovery and probing into AnalysisResult."""
 
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
@@ -15,36 +17,35 @@ from .probe import parse_tracks, probe_external_file, probe_file, ProbeError
 from .utils import console
 
 
-def _find_common_tracks(episodes: list[Episode], track_type: TrackType) -> list[str]:
+def _find_common_tracks(
+    episodes: list[Episode], track_type: TrackType
+) -> frozenset[str]:
     """Find track identity_keys present in ALL episodes."""
     if not episodes:
-        return []
+        return frozenset()
 
-    # Get tracks of the specified type from first episode
-    first_ep = episodes[0]
-    common_keys = {
-        t.identity_key for t in first_ep.embedded_tracks if t.track_type == track_type
-    }
-
-    # Intersect with each subsequent episode
-    for ep in episodes[1:]:
+    # Count in how many episodes each key occurs (once per episode, even if
+    # an episode has duplicate tracks); common keys occur in all of them
+    counts: dict[str, int] = {}
+    for ep in episodes:
         ep_keys = {
             t.identity_key for t in ep.embedded_tracks if t.track_type == track_type
         }
-        common_keys &= ep_keys
+        for key in ep_keys:
+            counts[key] = counts.get(key, 0) + 1
 
-    return sorted(common_keys)
+    total = len(episodes)
+    return frozenset(key for key, count in counts.items() if count == total)
 
 
 def _detect_missing_tracks(
-    episodes: list[Episode], common_audio: list[str], common_subs: list[str]
+    episodes: list[Episode],
+    all_audio_keys: frozenset[str],
+    all_sub_keys: frozenset[str],
 ) -> dict[int, list[str]]:
     """Detect which episodes are missing which tracks."""
     missing: dict[int, list[str]] = {}
 
-    all_audio_keys = set(common_audio)
-    all_sub_keys = set(common_subs)
-
     for ep in episodes:
         ep_audio_keys = {
             t.identity_key
@@ -66,6 +67,25 @@ def _detect_missing_tracks(
     return missing
 
 
+def _probe_episode(ep_num: int, video_path: Path) -> tuple[Episode, ProbeError | None]:
+    """
+    Probe one video file into an Episode.
+
+    On failure, returns an episode with no embedded tracks plus the error,
+    so the caller can report it.
+    """
+    try:
+        probe_data = probe_file(video_path)
+        tracks = parse_tracks(probe_data, video_path)
+    except ProbeError as e:
+        return Episode(number=ep_num, video_file=video_path), e
+
+    return (
+        Episode(number=ep_num, video_file=video_path, embedded_tracks=tracks),
+        None,
+    )
+
+
 def analyze_series(
     directory: Path,
     audio_dir: Path | None = None,
@@ -113,25 +133,32 @@ def analyze_series(
     ) as progress:
         task = progress.add_task("Probing", total=len(video_map))
 
-        for ep_num, video_path in sorted(video_map.items()):
-            try:
-                probe_data = probe_file(video_path)
-                tracks = parse_tracks(probe_data, video_path)
-
-                episodes[ep_num] = Episode(
-                    number=ep_num,
-                    video_file=video_path,
-                    embedded_tracks=tracks,
-                )
-            except ProbeError as e:
-                console.print(f"[yellow]Warning: {e}[/yellow]")
-                # Create episode with no embedded tracks
-                episodes[ep_num] = Episode(
-                    number=ep_num,
-                    video_file=video_path,
-                )
-
-            progress.advance(task)
+        # Each probe is an ffprobe subprocess, so run several at once.
+        # Progress advances as probes finish; results are then recorded in
+        # episode order to keep warnings and the episodes dict deterministic.
+        num_workers = max(1, min(len(video_map), os.cpu_count() or 1))
+        executor = ThreadPoolExecutor(max_workers=num_workers)
+        results: dict[int, tuple[Episode, ProbeError | None]] = {}
+        try:
+            futures = {
+                executor.submit(_probe_episode, ep_num, video_path): ep_num
+                for ep_num, video_path in sorted(video_map.items())
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                progress.advance(task)
+        except BaseException:
+            # Ctrl-C or an unexpected error: drop the queued probes instead
+            # of running them all before the exception can propagate
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+        for ep_num in sorted(results):
+            episode, error = results[ep_num]
+            if error is not None:
+                console.print(f"[yellow]Warning: {error}[/yellow]")
+            episodes[ep_num] = episode
 
     # Step 4: Discover external sources
     console.print("\n[blue]Searching for external audio sources...[/blue]")
@@ -193,8 +220,9 @@ def analyze_series(
 
     return AnalysisResult(
         episodes=episodes,
-        common_embedded_audio=common_audio,
-        common_embedded_subs=common_subs,
+        # Sorted so the selection menu lists tracks in a stable order
+        common_embedded_audio=sorted(common_audio),
+        common_embedded_subs=sorted(common_subs),
         external_audio_sources=external_audio,
         external_subtitle_sources=external_subs,
         missing_tracks=missing_tracks,
@@ -204,7 +232,4 @@ def analyze_series(
 
 def get_track_by_identity(episode: Episode, identity_key: str) -> Track | None:
     """Find a track in an episode by its identity key."""
-    for track in episode.embedded_tracks:
-        if track.identity_key == identity_key:
-            return track
-    return None
+    return episode.tracks_by_identity.get(identity_key)
@@ -5,7 +5,6 @@ from pathlib import Path
 from typing import Optional
 
 import typer
-from InquirerPy import inquirer
 
 from . import __version__
 from .analyzer import analyze_series
@@ -28,6 +27,10 @@ from .validation import (
     validate_output_directory,
 )
 
+# Set view of VALID_VIDEO_CODECS for membership checks; the tuple keeps the
+# display order used in error messages
+_VALID_CODECS_SET = frozenset(VALID_VIDEO_CODECS)
+
 app = typer.Typer(
     name="anime-mux",
     help="Consolidate anime releases into clean MKV files",
@@ -41,6 +44,51 @@ def version_callback(value: bool):
         raise typer.Exit()
 
 
+def validate_encoding_options(
+    video_codec: str, crf: Optional[int], quality: Optional[int]
+) -> tuple[Optional[str], list[str]]:
+    """
+    Validate the video codec and CRF/quality options.
+
+    Returns:
+        Tuple of (error_message, warnings). error_message is None when the
+        options are valid; warnings found before an error are still returned.
+    """
+    warnings: list[str] = []
+
+    # Validate video codec
+    video_codec_lower = video_codec.lower()
+    if video_codec_lower not in _VALID_CODECS_SET:
+        return (
+            f"Invalid video codec '{video_codec}'. "
+            f"Use one of: {', '.join(VALID_VIDEO_CODECS)}"
+        ), warnings
+
+    # Validate CRF if provided
+    if crf is not None:
+        if not (MIN_QUALITY_VALUE <= crf <= MAX_QUALITY_VALUE):
+            return (
+                f"CRF must be between {MIN_QUALITY_VALUE} and {MAX_QUALITY_VALUE}."
+            ), warnings
+        if video_codec_lower == "copy":
+            warnings.append("--crf is ignored when --video-codec is 'copy'.")
+        elif video_codec_lower in ("h264-vaapi", "hevc-vaapi"):
+            warnings.append("--crf is for CPU encoding. Use --quality for VA-API.")
+
+    # Validate quality if provided
+    if quality is not None:
+        if not (MIN_QUALITY_VALUE <= quality <= MAX_QUALITY_VALUE):
+            return (
+                f"--quality must be between {MIN_QUALITY_VALUE} and {MAX_QUALITY_VALUE}."
+            ), warnings
+        if video_codec_lower == "copy":
+            warnings.append("--quality is ignored when --video-codec is 'copy'.")
+        elif video_codec_lower in ("h264", "hevc"):
+            warnings.append("--quality is for VA-API. Use --crf for CPU encoding.")
+
+    return None, warnings
+
+
 @app.command()
 def main(
     directory: Path = typer.Argument(
@@ -118,47 +166,14 @@ def main(
     anime-mux consolidates anime releases by filtering embedded tracks
     and/or merging external audio/subtitle files into clean MKV containers.
     """
-    # Validate video codec
     video_codec_lower = video_codec.lower()
-    if video_codec_lower not in VALID_VIDEO_CODECS:
-        console.print(
-            f"[red]Error: Invalid video codec '{video_codec}'. "
-            f"Use one of: {', '.join(VALID_VIDEO_CODECS)}[/red]"
-        )
+    error, warnings = validate_encoding_options(video_codec, crf, quality)
+    for warning in warnings:
+        console.print(f"[yellow]Warning: {warning}[/yellow]")
+    if error:
+        console.print(f"[red]Error: {error}[/red]")
         sys.exit(1)
 
-    # Validate CRF if provided
-    if crf is not None:
-        if not (MIN_QUALITY_VALUE <= crf <= MAX_QUALITY_VALUE):
-            console.print(
-                f"[red]Error: CRF must be between {MIN_QUALITY_VALUE} and {MAX_QUALITY_VALUE}.[/red]"
-            )
-            sys.exit(1)
-        if video_codec_lower == "copy":
-            console.print(
-                "[yellow]Warning: --crf is ignored when --video-codec is 'copy'.[/yellow]"
-            )
-        elif video_codec_lower in ("h264-vaapi", "hevc-vaapi"):
-            console.print(
-                "[yellow]Warning: --crf is for CPU encoding. Use --quality for VA-API.[/yellow]"
-            )
-
-    # Validate quality if provided
-    if quality is not None:
-        if not (MIN_QUALITY_VALUE <= quality <= MAX_QUALITY_VALUE):
-            console.print(
-                f"[red]Error: --quality must be between {MIN_QUALITY_VALUE} and {MAX_QUALITY_VALUE}.[/red]"
-            )
-            sys.exit(1)
-        if video_codec_lower == "copy":
-            console.print(
-                "[yellow]Warning: --quality is ignored when --video-codec is 'copy'.[/yellow]"
-            )
-        elif video_codec_lower in ("h264", "hevc"):
-            console.print(
-                "[yellow]Warning: --quality is for VA-API. Use --crf for CPU encoding.[/yellow]"
-            )
-
     try:
         _run(
             directory,
@@ -196,6 +211,10 @@ def _run(
     log_file: Optional[Path],
 ):
     """Main workflow."""
+    # Imported lazily: InquirerPy (prompt_toolkit) is slow to import and is
+    # not needed for --help, --version or argument validation errors.
+    from InquirerPy import inquirer
+
     console.print(f"\n[bold]anime-mux v{__version__}[/bold]")
     console.print("=" * 50)
 
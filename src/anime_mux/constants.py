@@ -46,12 +46,19 @@ MAX_INTERLEAVE_DELTA_ZERO = "0"
 # FFprobe parameters
 FFPROBE_VERBOSE_LEVEL = "quiet"
 FFPROBE_OUTPUT_FORMAT = "json"
+FFPROBE_CACHE_SIZE = 256  # Probe results kept per (path, mtime, size)
 
 # Episode matching patterns
 SPECIAL_EPISODE_PREFIXES = ["OVA", "OAD", "SP", "Special", "Extra", "Bonus", "Movie"]
 
 # Video codec validation
-VALID_VIDEO_CODECS = ("copy", "h264", "h264-vaapi", "hevc", "hevc-vaapi")
+VALID_VIDEO_CODECS: tuple[str, ...] = (
+    "copy",
+    "h264",
+    "h264-vaapi",
+    "hevc",
+    "hevc-vaapi",
+)
 
 # Disk space
 DISK_SPACE_WARNING_THRESHOLD = 5 * 1024**3  # 5 GB
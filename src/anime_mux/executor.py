@@ -5,7 +5,9 @@ import re
 import shlex
 import subprocess
 import time
+from collections.abc import Iterable, Iterator
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
 from pathlib import Path
 
 from rich.progress import (
@@ -31,12 +33,37 @@ from .constants import (
     PROGRESS_TIMEOUT_SECONDS,
     VAAPI_DEVICE_PATH,
 )
-from .models import MergeJob, MergePlan, VideoCodec
+from .models import MergeJob, MergePlan, Track, VideoCodec
 from .probe import get_duration
 from .utils import console
 
+# Disposition by position within a track kind: the first track is default,
+# the rest are cleared
+_DISPOSITIONS = (DISPOSITION_DEFAULT, DISPOSITION_NONE)
 
-def build_ffmpeg_command(job: MergeJob, transcode_audio: bool = False) -> list[str]:
+_AUDIO_COPY_ARGS = ("-c:a", "copy")
+_AUDIO_AAC_ARGS = ("-c:a", "aac", "-b:a", AUDIO_BITRATE_256K)
+
+# Precomputed "input:stream" -map labels covering typical jobs (a few inputs,
+# a few dozen streams each); anything larger is formatted on demand
+_MAP_LABEL_INPUTS = 8
+_MAP_LABEL_STREAMS = 32
+_MAP_LABELS = tuple(
+    tuple(f"{i}:{j}" for j in range(_MAP_LABEL_STREAMS))
+    for i in range(_MAP_LABEL_INPUTS)
+)
+
+
+def _map_label(input_idx: int, stream_idx: int) -> str:
+    """Return the -map label for a stream of an input."""
+    if input_idx < _MAP_LABEL_INPUTS and stream_idx < _MAP_LABEL_STREAMS:
+        return _MAP_LABELS[input_idx][stream_idx]
+    return f"{input_idx}:{stream_idx}"
+
+
+def build_ffmpeg_command(
+    job: MergeJob, transcode_audio: bool = False
+) -> tuple[str, ...]:
     """
     Build FFmpeg command for a merge job.
 
@@ -46,9 +73,34 @@ def build_ffmpeg_command(job: MergeJob, transcode_audio: bool = False) -> list[s
     - Audio: copy as-is (or re-encode to AAC 256k if transcode_audio=True)
     - Use -disposition to set default tracks
     - Preserve attachments (fonts) from source
+
+    Returns the argv as an immutable tuple.
     """
-    cmd = ["ffmpeg", "-y"]
+    # Collect all input files, deduplicated in first-seen order (dicts keep
+    # insertion order), and number them for -map lookups
+    all_tracks = (*job.video_tracks, *job.audio_tracks, *job.subtitle_tracks)
+    input_files = dict.fromkeys(track.source_file for track in all_tracks)
+    input_map = {path: i for i, path in enumerate(input_files)}
+
+    # Each section yields its own arguments; the command is their concatenation
+    return tuple(
+        chain(
+            ("ffmpeg", "-y"),
+            _hwaccel_args(job),
+            _input_args(input_files),
+            _map_args(job, all_tracks, input_map),
+            _video_codec_args(job),
+            # Audio: copy or re-encode to AAC
+            _AUDIO_AAC_ARGS if transcode_audio else _AUDIO_COPY_ARGS,
+            ("-c:s", "copy"),
+            _disposition_args(job),
+            (os.fspath(job.output_path),),
+        )
+    )
+
 
+def _hwaccel_args(job: MergeJob) -> Iterator[str]:
+    """Hardware decoding arguments (VA-API only)."""
     # For VA-API, we need to specify the device and enable hardware decoding
     is_vaapi = job.video_encoding.codec in (
         VideoCodec.H264_VAAPI,
@@ -56,59 +108,43 @@ def build_ffmpeg_command(job: MergeJob, transcode_audio: bool = False) -> list[s
     )
     if is_vaapi:
         # Enable hardware decoding - keeps frames on GPU, avoiding CPU-GPU transfers
-        cmd.extend(["-hwaccel", "vaapi"])
-        cmd.extend(["-hwaccel_device", VAAPI_DEVICE_PATH])
-        cmd.extend(["-hwaccel_output_format", "vaapi"])
+        yield from ("-hwaccel", "vaapi")
+        yield from ("-hwaccel_device", VAAPI_DEVICE_PATH)
+        yield from ("-hwaccel_output_format", "vaapi")
 
-    # Collect all input files
-    input_files: list[Path] = []
-    input_map: dict[Path, int] = {}
 
-    def get_input_index(file_path: Path) -> int:
-        if file_path not in input_map:
-            input_map[file_path] = len(input_files)
-            input_files.append(file_path)
-        return input_map[file_path]
-
-    # Register all source files
-    for track in job.video_tracks + job.audio_tracks + job.subtitle_tracks:
-        get_input_index(track.source_file)
-
-    # Add inputs
+def _input_args(input_files: Iterable[Path]) -> Iterator[str]:
+    """One -i per unique input, in input-number order."""
+    # Each unique path is converted to a string exactly once
     for f in input_files:
-        cmd.extend(["-i", str(f)])
+        yield from ("-i", os.fspath(f))
 
-    # Map video tracks
-    for track in job.video_tracks:
-        input_idx = input_map[track.source_file]
-        cmd.extend(["-map", f"{input_idx}:{track.index}"])
-
-    # Map audio tracks
-    for track in job.audio_tracks:
-        input_idx = input_map[track.source_file]
-        cmd.extend(["-map", f"{input_idx}:{track.index}"])
 
-    # Map subtitle tracks
-    for track in job.subtitle_tracks:
+def _map_args(
+    job: MergeJob, tracks: Iterable[Track], input_map: dict[Path, int]
+) -> Iterator[str]:
+    """-map arguments for the selected tracks, then attachments."""
+    # Map video, then audio, then subtitle tracks
+    for track in tracks:
         input_idx = input_map[track.source_file]
-        cmd.extend(["-map", f"{input_idx}:{track.index}"])
+        yield from ("-map", _map_label(input_idx, track.index))
 
     # Map attachments from primary video file (fonts, etc.)
     if job.preserve_attachments:
         primary_input = input_map[job.episode.video_file]
-        cmd.extend(
-            ["-map", f"{primary_input}:t?"]
-        )  # :t for attachments, ? for optional
+        yield from ("-map", f"{primary_input}:t?")  # :t for attachments, ? for optional
         # Fix audio/video interleaving when attachments are mapped from a different
         # input than audio. Without this, ffmpeg may write all audio packets first,
         # causing players to appear to have no audio during video playback.
-        cmd.extend(["-max_interleave_delta", MAX_INTERLEAVE_DELTA_ZERO])
+        yield from ("-max_interleave_delta", MAX_INTERLEAVE_DELTA_ZERO)
 
-    # Video codec handling
+
+def _video_codec_args(job: MergeJob) -> Iterator[str]:
+    """Video codec arguments: stream copy or encoder settings."""
     if job.video_encoding.codec == VideoCodec.COPY:
-        cmd.extend(["-c:v", "copy"])
+        yield from ("-c:v", "copy")
     elif job.video_encoding.codec == VideoCodec.H264:
-        cmd.extend(["-c:v", "libx264"])
+        yield from ("-c:v", "libx264")
 
         # Calculate CRF based on first video track's metadata
         if job.video_tracks:
@@ -123,16 +159,16 @@ def build_ffmpeg_command(job: MergeJob, transcode_audio: bool = False) -> list[s
             # Fallback if no video track metadata
             crf = job.video_encoding.crf if job.video_encoding.crf else 20
 
-        cmd.extend(["-crf", str(crf)])
-        cmd.extend(["-preset", ENCODING_PRESET_MEDIUM])
+        yield from ("-crf", str(crf))
+        yield from ("-preset", ENCODING_PRESET_MEDIUM)
         # Ensure output is compatible with most players
-        cmd.extend(["-pix_fmt", PIXEL_FORMAT_YUV420P])
+        yield from ("-pix_fmt", PIXEL_FORMAT_YUV420P)
     elif job.video_encoding.codec == VideoCodec.H264_VAAPI:
         # VA-API hardware encoding
         # With -hwaccel_output_format vaapi, frames are already on GPU
         # No filter needed - frames go directly from decoder to encoder
-        cmd.extend(["-c:v", "h264_vaapi"])
-        cmd.extend(["-rc_mode", "CQP"])
+        yield from ("-c:v", "h264_vaapi")
+        yield from ("-rc_mode", "CQP")
 
         # Calculate quality based on first video track's metadata
         if job.video_tracks:
@@ -147,11 +183,11 @@ def build_ffmpeg_command(job: MergeJob, transcode_audio: bool = False) -> list[s
             # Fallback if no video track metadata
             quality = job.video_encoding.quality if job.video_encoding.quality else 22
 
-        cmd.extend(["-global_quality", str(quality)])
+        yield from ("-global_quality", str(quality))
         # Disable B-frames for better AMD compatibility
-        cmd.extend(["-bf", BF_FRAMES_ZERO])
+        yield from ("-bf", BF_FRAMES_ZERO)
     elif job.video_encoding.codec == VideoCodec.HEVC:
-        cmd.extend(["-c:v", "libx265"])
+        yield from ("-c:v", "libx265")
 
         # Calculate CRF based on first video track's metadata
         if job.video_tracks:
@@ -166,16 +202,16 @@ def build_ffmpeg_command(job: MergeJob, transcode_audio: bool = False) -> list[s
             # Fallback if no video track metadata (25 = base 20 + 5 for HEVC)
             crf = job.video_encoding.crf if job.video_encoding.crf else 25
 
-        cmd.extend(["-crf", str(crf)])
-        cmd.extend(["-preset", ENCODING_PRESET_MEDIUM])
+        yield from ("-crf", str(crf))
+        yield from ("-preset", ENCODING_PRESET_MEDIUM)
         # Ensure output is compatible with most players
-        cmd.extend(["-pix_fmt", PIXEL_FORMAT_YUV420P])
+        yield from ("-pix_fmt", PIXEL_FORMAT_YUV420P)
     elif job.video_encoding.codec == VideoCodec.HEVC_VAAPI:
         # VA-API hardware encoding
         # With -hwaccel_output_format vaapi, frames are already on GPU
         # No filter needed - frames go directly from decoder to encoder
-        cmd.extend(["-c:v", "hevc_vaapi"])
-        cmd.extend(["-rc_mode", "CQP"])
+        yield from ("-c:v", "hevc_vaapi")
+        yield from ("-rc_mode", "CQP")
 
         # Calculate quality based on first video track's metadata
         if job.video_tracks:
@@ -190,33 +226,17 @@ def build_ffmpeg_command(job: MergeJob, transcode_audio: bool = False) -> list[s
             # Fallback if no video track metadata (27 = base 22 + 5 for HEVC)
             quality = job.video_encoding.quality if job.video_encoding.quality else 27
 
-        cmd.extend(["-global_quality", str(quality)])
-
-    # Audio: copy or re-encode to AAC
-    if transcode_audio:
-        cmd.extend(["-c:a", "aac", "-b:a", AUDIO_BITRATE_256K])
-    else:
-        cmd.extend(["-c:a", "copy"])
-    cmd.extend(["-c:s", "copy"])
-
-    # Set dispositions (first audio and first subtitle are default)
-    if job.audio_tracks:
-        cmd.extend(["-disposition:a:0", DISPOSITION_DEFAULT])
-        for i in range(1, len(job.audio_tracks)):
-            cmd.extend([f"-disposition:a:{i}", DISPOSITION_NONE])
-
-    if job.subtitle_tracks:
-        cmd.extend(["-disposition:s:0", DISPOSITION_DEFAULT])
-        for i in range(1, len(job.subtitle_tracks)):
-            cmd.extend([f"-disposition:s:{i}", DISPOSITION_NONE])
+        yield from ("-global_quality", str(quality))
 
-    # Output file
-    cmd.append(str(job.output_path))
 
-    return cmd
+def _disposition_args(job: MergeJob) -> Iterator[str]:
+    """Dispositions: first audio and first subtitle are default."""
+    for kind, tracks in (("a", job.audio_tracks), ("s", job.subtitle_tracks)):
+        for i in range(len(tracks)):
+            yield from (f"-disposition:{kind}:{i}", _DISPOSITIONS[min(i, 1)])
 
 
-def run_ffmpeg(cmd: list[str]) -> tuple[bool, str | None]:
+def run_ffmpeg(cmd: tuple[str, ...]) -> tuple[bool, str | None]:
     """
     Run FFmpeg command with proper error handling.
 
@@ -248,7 +268,7 @@ def run_ffmpeg(cmd: list[str]) -> tuple[bool, str | None]:
 
 
 def run_ffmpeg_with_progress(
-    cmd: list[str],
+    cmd: tuple[str, ...],
     duration_seconds: float,
     progress: Progress,
     task_id: TaskID,
@@ -267,7 +287,7 @@ def run_ffmpeg_with_progress(
     """
     # Add progress output to FFmpeg command
     # Insert before output file (last argument)
-    cmd_with_progress = cmd[:-1] + ["-progress", "pipe:1", "-nostats", cmd[-1]]
+    cmd_with_progress = (*cmd[:-1], "-progress", "pipe:1", "-nostats", cmd[-1])
 
     # Calculate timeout thresholds
     # Progress timeout: time without progress updates before considering it hung
@@ -9,24 +9,58 @@ from .constants import SPECIAL_EPISODE_PREFIXES
 # The number is optional - missing number implies episode 1
 # Imported from constants: SPECIAL_EPISODE_PREFIXES
 
+# Static patterns are compiled once at import; only the per-template patterns
+# (which embed the literal filename around the number) are built per call.
+_DIGITS_PATTERN = re.compile(r"\d+")
+
+# Pattern per prefix: prefix followed by optional digits, case-insensitive.
+# The prefix must be a word boundary (not part of a larger word)
+_PREFIX_PATTERNS = tuple(
+    (
+        prefix,
+        re.compile(
+            rf"(?<![a-zA-Z])({re.escape(prefix)})(\d*)(?![a-zA-Z\d])",
+            re.IGNORECASE,
+        ),
+    )
+    for prefix in SPECIAL_EPISODE_PREFIXES
+)
+
 
-def _try_prefixed_pattern(files: list[Path]) -> dict[int, Path]:
+def _match_all(pattern: re.Pattern[str], names: list[str]) -> dict[int, int] | None:
+    """
+    Map episode number -> name index if pattern fits every name uniquely.
+
+    The pattern's first group holds the episode number; an empty group means
+    episode 1. Bails out with None on the first name that doesn't match or
+    that repeats an episode number already seen, without scanning the rest.
+    """
+    episode_map: dict[int, int] = {}
+    for i, name in enumerate(names):
+        match = pattern.match(name)
+        if match is None:
+            return None
+        num_str = match.group(1)
+        episode_num = int(num_str) if num_str else 1
+        if episode_num in episode_map:
+            return None
+        episode_map[episode_num] = i
+    return episode_map
+
+
+def _try_prefixed_pattern(names: list[str]) -> dict[int, int]:
     """
     Try to match prefixed episode patterns like OVA, OVA2, OVA3.
 
     These patterns have an alphabetic prefix followed by an optional number,
     where missing number implies episode 1.
-    """
-    for prefix in SPECIAL_EPISODE_PREFIXES:
-        # Pattern: prefix followed by optional digits, case-insensitive
-        # The prefix must be a word boundary (not part of a larger word)
-        prefix_pattern = re.compile(
-            rf"(?<![a-zA-Z])({re.escape(prefix)})(\d*)(?![a-zA-Z\d])",
-            re.IGNORECASE,
-        )
 
+    Works on plain filenames and returns a mapping of episode number to the
+    index of the matching name.
+    """
+    template_name = names[0]
+    for prefix, prefix_pattern in _PREFIX_PATTERNS:
         # Find the prefix in first file to establish template
-        template_name = files[0].name
         matches = list(prefix_pattern.finditer(template_name))
 
         for match in matches:
@@ -40,24 +74,10 @@ def _try_prefixed_pattern(files: list[Path]) -> dict[int, Path]:
             )
             pattern = re.compile(pattern_str, re.IGNORECASE)
 
-            episode_map: dict[int, Path] = {}
-            is_valid = True
-
-            for file_path in files:
-                file_match = pattern.match(file_path.name)
-                if file_match:
-                    num_str = file_match.group(1)
-                    # Empty string means episode 1, otherwise use the number
-                    episode_num = int(num_str) if num_str else 1
-                    if episode_num in episode_map:
-                        is_valid = False
-                        break
-                    episode_map[episode_num] = file_path
-                else:
-                    is_valid = False
-                    break
-
-            if is_valid and len(episode_map) == len(files):
+            # Check every name against it; _match_all returns episode -> name
+            # index (empty number = episode 1) or None on any miss/duplicate
+            episode_map = _match_all(pattern, names)
+            if episode_map is not None:
                 return episode_map
 
     return {}
@@ -79,13 +99,17 @@ def extract_episode_numbers(files: list[Path]) -> dict[int, Path]:
     if len(files) == 1:
         return {1: files[0]}
 
+    # Take every filename once up front; each candidate pattern below is then
+    # checked against the same batch of plain strings.
+    names = [f.name for f in files]
+
     # Use the first filename as a template to generate potential patterns.
-    template_name = files[0].name
+    template_name = names[0]
 
     # Find all numeric sequences in the template filename.
     # We iterate through them in reverse order, as episode numbers are often
     # found later in filenames and are less likely to be static parts like '1080p'.
-    numeric_parts = list(re.finditer(r"\d+", template_name))
+    numeric_parts = list(_DIGITS_PATTERN.finditer(template_name))
 
     for match in reversed(numeric_parts):
         # Create a regex pattern by replacing this number with a capture group
@@ -98,33 +122,17 @@ def extract_episode_numbers(files: list[Path]) -> dict[int, Path]:
         pattern_str = f"^{re.escape(prefix)}(\\d+){re.escape(suffix)}$"
         pattern = re.compile(pattern_str, re.IGNORECASE)
 
-        # Test this generated pattern against all provided filenames.
-        episode_map: dict[int, Path] = {}
-        is_pattern_valid = True
-
-        for file_path in files:
-            match_obj = pattern.match(file_path.name)
-            if match_obj:
-                episode_num = int(match_obj.group(1))
-                # A valid pattern must not produce duplicate episode numbers
-                if episode_num in episode_map:
-                    is_pattern_valid = False
-                    break
-                episode_map[episode_num] = file_path
-            else:
-                # If any file doesn't match, this pattern is incorrect.
-                is_pattern_valid = False
-                break
-
-        # A pattern is considered successful if it matched every single file
+        # Test this generated pattern against all provided filenames. A
+        # pattern is considered successful if it matched every single file
         # and each file mapped to a unique episode number.
-        if is_pattern_valid and len(episode_map) == len(files):
-            return episode_map
+        episode_map = _match_all(pattern, names)
+        if episode_map is not None:
+            return {ep: files[i] for ep, i in episode_map.items()}
 
     # Try prefixed patterns (OVA, SP, etc.) as fallback
-    prefixed_result = _try_prefixed_pattern(files)
+    prefixed_result = _try_prefixed_pattern(names)
     if prefixed_result:
-        return prefixed_result
+        return {ep: files[i] for ep, i in prefixed_result.items()}
 
     # No valid pattern found
     return {}
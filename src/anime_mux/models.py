@@ -1,5 +1,7 @@
 """Data models for anime-mux."""
 
+import sys
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from pathlib import Path
@@ -56,7 +58,34 @@ class VideoCodec(Enum):
     HEVC_VAAPI = auto()  # hevc_vaapi (Linux VA-API, works with AMD/Intel)
 
 
-@dataclass
+# Resolution tiers by minimum height; bisect_right over these gives the index
+# into the per-tier tables below (0 = below 480p ... 4 = 4K)
+_TIER_MIN_HEIGHTS = (480, 720, 1080, 2160)
+_BASE_CRF_BY_TIER = (
+    BASE_CRF_LOWER,
+    BASE_CRF_480P,
+    BASE_CRF_720P,
+    BASE_CRF_1080P,
+    BASE_CRF_4K,
+)
+_BASE_QUALITY_BY_TIER = (
+    BASE_QUALITY_LOWER,
+    BASE_QUALITY_480P,
+    BASE_QUALITY_720P,
+    BASE_QUALITY_1080P,
+    BASE_QUALITY_4K,
+)
+_TYPICAL_BITRATE_BY_TIER = (
+    TYPICAL_BITRATE_LOWER,
+    TYPICAL_BITRATE_480P,
+    TYPICAL_BITRATE_720P,
+    TYPICAL_BITRATE_1080P,
+    TYPICAL_BITRATE_4K,
+)
+_HEVC_CODECS = frozenset({VideoCodec.HEVC, VideoCodec.HEVC_VAAPI})
+
+
+@dataclass(frozen=True, slots=True)
 class VideoEncodingConfig:
     """Configuration for video encoding."""
 
@@ -92,25 +121,11 @@ class VideoEncodingConfig:
         if self.crf is not None:
             return self.crf
 
-        # Use defaults if dimensions unknown
-        h = height or 1080
-
-        # Base CRF by resolution (using height as primary indicator)
-        if h >= 2160:
-            base_crf = BASE_CRF_4K
-            typical_bitrate = TYPICAL_BITRATE_4K
-        elif h >= 1080:
-            base_crf = BASE_CRF_1080P
-            typical_bitrate = TYPICAL_BITRATE_1080P
-        elif h >= 720:
-            base_crf = BASE_CRF_720P
-            typical_bitrate = TYPICAL_BITRATE_720P
-        elif h >= 480:
-            base_crf = BASE_CRF_480P
-            typical_bitrate = TYPICAL_BITRATE_480P
-        else:
-            base_crf = BASE_CRF_LOWER
-            typical_bitrate = TYPICAL_BITRATE_LOWER
+        # Base CRF by resolution (using height as primary indicator);
+        # use defaults if dimensions unknown
+        tier = bisect_right(_TIER_MIN_HEIGHTS, height or 1080)
+        base_crf = _BASE_CRF_BY_TIER[tier]
+        typical_bitrate = _TYPICAL_BITRATE_BY_TIER[tier]
 
         # Adjust based on source bitrate
         if bitrate is not None and bitrate > 0:
@@ -127,7 +142,7 @@ class VideoEncodingConfig:
 
         # HEVC is ~30-50% more efficient than H.264, so we can use higher CRF
         # for equivalent quality. +5 is a conservative offset.
-        if codec in (VideoCodec.HEVC, VideoCodec.HEVC_VAAPI):
+        if codec in _HEVC_CODECS:
             base_crf += HEVC_CODEC_OFFSET
 
         # Clamp to valid range
@@ -158,25 +173,10 @@ class VideoEncodingConfig:
         if self.quality is not None:
             return self.quality
 
-        # Use defaults if dimensions unknown
-        h = height or 1080
-
-        # Base quality by resolution
-        if h >= 2160:
-            base_quality = BASE_QUALITY_4K
-            typical_bitrate = TYPICAL_BITRATE_4K
-        elif h >= 1080:
-            base_quality = BASE_QUALITY_1080P
-            typical_bitrate = TYPICAL_BITRATE_1080P
-        elif h >= 720:
-            base_quality = BASE_QUALITY_720P
-            typical_bitrate = TYPICAL_BITRATE_720P
-        elif h >= 480:
-            base_quality = BASE_QUALITY_480P
-            typical_bitrate = TYPICAL_BITRATE_480P
-        else:
-            base_quality = BASE_QUALITY_LOWER
-            typical_bitrate = TYPICAL_BITRATE_LOWER
+        # Base quality by resolution; use defaults if dimensions unknown
+        tier = bisect_right(_TIER_MIN_HEIGHTS, height or 1080)
+        base_quality = _BASE_QUALITY_BY_TIER[tier]
+        typical_bitrate = _TYPICAL_BITRATE_BY_TIER[tier]
 
         # Adjust based on source bitrate
         if bitrate is not None and bitrate > 0:
@@ -189,13 +189,13 @@ class VideoEncodingConfig:
                 base_quality += 1
 
         # HEVC is more efficient, use higher quality value for same visual quality
-        if codec in (VideoCodec.HEVC, VideoCodec.HEVC_VAAPI):
+        if codec in _HEVC_CODECS:
             base_quality += HEVC_CODEC_OFFSET
 
         return max(MIN_QUALITY_VALUE, min(MAX_QUALITY_VALUE, base_quality))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Track:
     """Represents a single track (audio, subtitle, etc.)."""
 
@@ -213,6 +213,27 @@ class Track:
     width: Optional[int] = None
     height: Optional[int] = None
     bitrate: Optional[int] = None  # bits per second
+    # Key used to match 'same' tracks across different episode files.
+    # Two tracks are considered equivalent if they have the same identity_key.
+    # Derived from the fields above once, in __post_init__.
+    identity_key: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # A handful of codec and language values repeat across every track of
+        # a series; share one string object per value. Frozen, so fields are
+        # set through object.__setattr__ here and below
+        object.__setattr__(self, "codec", sys.intern(self.codec))
+        object.__setattr__(self, "language", sys.intern(self.language))
+
+        if self.track_type == TrackType.AUDIO:
+            key = f"audio|{self.language}|{self.title or ''}|{self.channels or 0}"
+        elif self.track_type == TrackType.SUBTITLE:
+            key = f"sub|{self.language}|{self.title or ''}|{self.is_forced}"
+        else:
+            key = f"{self.track_type.name}|{self.codec}"
+        # Keys repeat across every episode; interning lets equal keys share
+        # one object so set/dict lookups can short-circuit on identity
+        object.__setattr__(self, "identity_key", sys.intern(key))
 
     @property
     def display_name(self) -> str:
@@ -228,21 +249,8 @@ class Track:
         else:
             return f"{self.track_type.name}: {self.codec}"
 
-    @property
-    def identity_key(self) -> str:
-        """
-        Key used to match 'same' tracks across different episode files.
-        Two tracks are considered equivalent if they have the same identity_key.
-        """
-        if self.track_type == TrackType.AUDIO:
-            return f"audio|{self.language}|{self.title or ''}|{self.channels or 0}"
-        elif self.track_type == TrackType.SUBTITLE:
-            return f"sub|{self.language}|{self.title or ''}|{self.is_forced}"
-        else:
-            return f"{self.track_type.name}|{self.codec}"
-
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Episode:
     """Represents a single episode with all its available tracks."""
 
@@ -251,6 +259,17 @@ class Episode:
     embedded_tracks: list[Track] = field(default_factory=list)
     external_audio: dict[str, Track] = field(default_factory=dict)
     external_subs: dict[str, Track] = field(default_factory=dict)
+    # Embedded tracks indexed by identity_key, built once in __post_init__
+    # (embedded tracks are fixed at construction). If several tracks share a
+    # key, the first one (in stream order) wins.
+    tracks_by_identity: dict[str, Track] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        index: dict[str, Track] = {}
+        for t in self.embedded_tracks:
+            index.setdefault(t.identity_key, t)
+        # Frozen: set the derived field through object.__setattr__
+        object.__setattr__(self, "tracks_by_identity", index)
 
     def get_all_audio_options(self) -> list[tuple[str, Track]]:
         """Returns all audio options as (source_name, track) pairs."""
@@ -283,7 +302,7 @@ class ExternalSource:
     files: dict[int, Path] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MergeJob:
     """Specification for producing one output file."""
 
@@ -305,7 +324,7 @@ class MergePlan:
     skipped_episodes: list[int] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AnalysisResult:
     """Result of analyzing a series directory."""
 
@@ -2,8 +2,6 @@
 
 from pathlib import Path
 
-from rich.table import Table
-
 from .analyzer import get_track_by_identity
 from .models import (
     AnalysisResult,
@@ -143,6 +141,8 @@ def build_merge_plan(
 
 def display_merge_plan(plan: MergePlan) -> None:
     """Display the merge plan for user confirmation."""
+    from rich.table import Table
+
     console.print("\n" + "=" * 70)
     console.print("[bold]MERGE PLAN[/bold]", justify="center")
     console.print("=" * 70)
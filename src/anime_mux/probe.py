@@ -2,9 +2,13 @@
 
 import json
 import subprocess
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 from .constants import (
+    FFPROBE_CACHE_SIZE,
     FFPROBE_OUTPUT_FORMAT,
     FFPROBE_VERBOSE_LEVEL,
 )
@@ -59,10 +63,30 @@ def probe_file(file_path: Path) -> dict:
     """
     Run ffprobe and return parsed JSON.
 
+    Results are cached per (path, mtime, size), so probing an unchanged file
+    again (e.g. for its duration at merge time) doesn't rerun ffprobe. The
+    returned dict may be shared between callers; treat it as read-only.
+
     Raises:
         FFprobeNotFoundError: If ffprobe executable is not found
         ProbeError: If ffprobe fails or returns invalid output
     """
+    try:
+        st = file_path.stat()
+    except OSError:
+        # Unreadable or missing: let ffprobe report the problem, uncached
+        return _run_ffprobe(file_path)
+    return _probe_file_cached(file_path, st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=FFPROBE_CACHE_SIZE)
+def _probe_file_cached(file_path: Path, mtime_ns: int, size: int) -> dict:
+    """Memoized _run_ffprobe; mtime and size only serve as cache keys."""
+    return _run_ffprobe(file_path)
+
+
+def _run_ffprobe(file_path: Path) -> dict:
+    """Run ffprobe on a file and parse its JSON output."""
     try:
         cmd = [
             "ffprobe",
@@ -74,7 +98,9 @@ def probe_file(file_path: Path) -> dict:
             "-show_format",
             str(file_path),
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        # Keep stdout as bytes: json.loads decodes UTF-8 itself, so there is
+        # no need for a separate text-mode decode of the whole output first
+        result = subprocess.run(cmd, capture_output=True, check=True)
         return json.loads(result.stdout)
     except FileNotFoundError:
         raise FFprobeNotFoundError("ffprobe not found. Please install ffmpeg.")
@@ -84,86 +110,125 @@ def probe_file(file_path: Path) -> dict:
         raise ProbeError(f"Invalid ffprobe output for {file_path.name}: {e}")
 
 
-def _get_tag(tags: dict, *keys: str) -> str | None:
-    """Get a tag value, trying multiple key variations."""
+# ffprobe codec_type -> TrackType for the stream kinds we keep
+_TRACK_TYPES_BY_CODEC_TYPE: dict[str, TrackType] = {
+    "video": TrackType.VIDEO,
+    "audio": TrackType.AUDIO,
+    "subtitle": TrackType.SUBTITLE,
+    "attachment": TrackType.ATTACHMENT,
+}
+
+# Shared stand-in for a missing format/tags/disposition block, so probes
+# without one don't each allocate an empty dict (read-only, so safe to share)
+_EMPTY_MAPPING: Mapping = MappingProxyType({})
+
+# Tag names to try, in priority order, already lowercased to match the
+# dicts built by _lowercase_tags
+_LANGUAGE_TAG_KEYS = ("language", "lang")
+_TITLE_TAG_KEYS = ("title", "name")
+
+
+def _lowercase_tags(tags: Mapping) -> dict:
+    """
+    Re-key a stream's tags by lowercased name, once per stream.
+
+    Lookups on the result hit on the first probe regardless of how the
+    container spelled the key (language, LANGUAGE, Language). If a key
+    appears in several spellings, the first one in ffprobe's order wins.
+    """
+    lowered: dict = {}
+    for k, v in tags.items():
+        lowered.setdefault(k.lower(), v)
+    return lowered
+
+
+def _disposition_flags(stream: dict) -> tuple[bool, bool]:
+    """Return (is_forced, is_default) from a stream's disposition block."""
+    # ffprobe reports each flag as 0 or 1; a missing flag reads as None
+    disposition = stream.get("disposition") or _EMPTY_MAPPING
+    return bool(disposition.get("forced")), bool(disposition.get("default"))
+
+
+def _get_lowered_tag(tags_lower: dict, keys: tuple[str, ...]) -> str | None:
+    """Get a tag value from a _lowercase_tags dict; keys must be lowercase."""
     for k in keys:
-        if k in tags:
-            return tags[k]
-        if k.upper() in tags:
-            return tags[k.upper()]
-        if k.lower() in tags:
-            return tags[k.lower()]
+        value = tags_lower.get(k)
+        if value is not None:
+            return value
     return None
 
 
-def parse_tracks(probe_data: dict, source_file: Path) -> list[Track]:
-    """Convert ffprobe output to Track objects."""
-    tracks = []
+def _parse_bitrate(value: object) -> int | None:
+    """Parse an ffprobe bit_rate value; None if missing or not a number."""
+    # ffprobe normally emits a string, but some builds/wrappers give an int
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    # ffprobe reports unknown rates as "N/A": check for digits up front
+    # instead of raising and catching ValueError
+    if isinstance(value, str) and value.isdecimal():
+        return int(value)
+    return None
 
-    # Get format-level bitrate as fallback (when stream bitrate is unavailable)
-    format_info = probe_data.get("format", {})
-    format_bitrate = format_info.get("bit_rate")
-    if format_bitrate:
-        try:
-            format_bitrate = int(format_bitrate)
-        except (ValueError, TypeError):
-            format_bitrate = None
-    else:
-        format_bitrate = None
-
-    for stream in probe_data.get("streams", []):
-        codec_type = stream.get("codec_type")
-
-        if codec_type == "video":
-            track_type = TrackType.VIDEO
-        elif codec_type == "audio":
-            track_type = TrackType.AUDIO
-        elif codec_type == "subtitle":
-            track_type = TrackType.SUBTITLE
-        elif codec_type == "attachment":
-            track_type = TrackType.ATTACHMENT
-        else:
-            continue
-
-        tags = stream.get("tags", {})
-        disposition = stream.get("disposition", {})
-
-        # Extract video-specific metadata
-        width = None
-        height = None
-        bitrate = None
-
-        if codec_type == "video":
+
+def _build_track(
+    stream: dict, source_file: Path, format_bitrate: int | None
+) -> Track | None:
+    """Convert one ffprobe stream to a Track; None for unsupported streams."""
+    codec_type = stream.get("codec_type", "")
+
+    # Data and other unsupported stream types are skipped
+    track_type = _TRACK_TYPES_BY_CODEC_TYPE.get(codec_type)
+    if track_type is None:
+        return None
+
+    tags = _lowercase_tags(stream.get("tags") or _EMPTY_MAPPING)
+    is_forced, is_default = _disposition_flags(stream)
+
+    # Type-specific metadata: video dimensions/bitrate, audio channels
+    width = None
+    height = None
+    bitrate = None
+    channels = None
+
+    match track_type:
+        case TrackType.VIDEO:
             width = stream.get("width")
             height = stream.get("height")
             # Try stream-level bitrate first, fall back to format bitrate
-            stream_bitrate = stream.get("bit_rate")
-            if stream_bitrate:
-                try:
-                    bitrate = int(stream_bitrate)
-                except (ValueError, TypeError):
-                    bitrate = format_bitrate
-            else:
+            bitrate = _parse_bitrate(stream.get("bit_rate"))
+            if bitrate is None:
                 bitrate = format_bitrate
+        case TrackType.AUDIO:
+            channels = stream.get("channels")
+
+    return Track(
+        index=stream["index"],
+        track_type=track_type,
+        codec=stream.get("codec_name", "unknown"),
+        language=_get_lowered_tag(tags, _LANGUAGE_TAG_KEYS) or "und",
+        title=_get_lowered_tag(tags, _TITLE_TAG_KEYS),
+        source=TrackSource.EMBEDDED,
+        source_file=source_file,
+        channels=channels,
+        is_forced=is_forced,
+        is_default=is_default,
+        width=width,
+        height=height,
+        bitrate=bitrate,
+    )
 
-        track = Track(
-            index=stream["index"],
-            track_type=track_type,
-            codec=stream.get("codec_name", "unknown"),
-            language=_get_tag(tags, "language", "lang") or "und",
-            title=_get_tag(tags, "title", "name"),
-            source=TrackSource.EMBEDDED,
-            source_file=source_file,
-            channels=stream.get("channels") if codec_type == "audio" else None,
-            is_forced=disposition.get("forced", 0) == 1,
-            is_default=disposition.get("default", 0) == 1,
-            width=width,
-            height=height,
-            bitrate=bitrate,
-        )
-        tracks.append(track)
 
-    return tracks
+def parse_tracks(probe_data: dict, source_file: Path) -> list[Track]:
+    """Convert ffprobe output to Track objects."""
+    # Get format-level bitrate as fallback (when stream bitrate is unavailable)
+    format_info = probe_data.get("format") or _EMPTY_MAPPING
+    format_bitrate = _parse_bitrate(format_info.get("bit_rate"))
+
+    return [
+        track
+        for stream in probe_data.get("streams") or ()
+        if (track := _build_track(stream, source_file, format_bitrate)) is not None
+    ]
 
 
 def probe_external_file(file_path: Path, track_type: TrackType) -> Track | None:
@@ -186,22 +251,22 @@ def probe_external_file(file_path: Path, track_type: TrackType) -> Track | None:
 
     for stream in streams:
         if stream.get("codec_type") == expected_codec_type:
-            tags = stream.get("tags", {})
-            disposition = stream.get("disposition", {})
+            tags = _lowercase_tags(stream.get("tags") or _EMPTY_MAPPING)
+            is_forced, is_default = _disposition_flags(stream)
 
             return Track(
                 index=stream["index"],
                 track_type=track_type,
                 codec=stream.get("codec_name", "unknown"),
-                language=_get_tag(tags, "language", "lang") or "und",
-                title=_get_tag(tags, "title", "name"),
+                language=_get_lowered_tag(tags, _LANGUAGE_TAG_KEYS) or "und",
+                title=_get_lowered_tag(tags, _TITLE_TAG_KEYS),
                 source=TrackSource.EXTERNAL,
                 source_file=file_path,
                 channels=stream.get("channels")
                 if track_type == TrackType.AUDIO
                 else None,
-                is_forced=disposition.get("forced", 0) == 1,
-                is_default=disposition.get("default", 0) == 1,
+                is_forced=is_forced,
+                is_default=is_default,
             )
 
     return None
@@ -2,10 +2,6 @@
 
 from dataclasses import dataclass
 
-from InquirerPy import inquirer
-from InquirerPy.base.control import Choice
-from rich.table import Table
-
 from .analyzer import get_track_by_identity
 from .models import AnalysisResult
 from .utils import console
@@ -17,7 +13,7 @@ class AbortError(Exception):
     pass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TrackSelection:
     """Represents a user's track selection."""
 
@@ -42,6 +38,8 @@ class SelectionResult:
 
 def display_analysis(analysis: AnalysisResult):
     """Display the analysis results in a formatted table."""
+    from rich.table import Table
+
     console.print("\n" + "=" * 70)
     console.print("[bold]TRACK ANALYSIS[/bold]", justify="center")
     console.print("=" * 70)
@@ -110,16 +108,33 @@ def display_analysis(analysis: AnalysisResult):
     return audio_options, sub_options
 
 
+def _at_least_one(result: list) -> bool:
+    """Checkbox validator: require at least one selected item."""
+    return len(result) >= 1
+
+
+def _count_selected(result: list) -> str:
+    """Checkbox transformer: summarize the selection as a count."""
+    return f"{len(result)} track(s) selected"
+
+
+def _count_selected_or_none(result: list) -> str:
+    """Checkbox transformer that shows 'None' for an empty selection."""
+    return _count_selected(result) if result else "None"
+
+
 def _build_checkbox_choices(
     options: list[tuple[str, bool, str]],
-) -> list[Choice]:
-    """Build InquirerPy Choice objects from options."""
-    choices = []
-    for i, (identifier, is_embedded, display_name) in enumerate(options):
-        source_tag = "[embedded]" if is_embedded else "[external]"
-        name = f"{source_tag} {display_name}"
-        choices.append(Choice(value=i, name=name, enabled=False))
-    return choices
+) -> list[dict]:
+    """Build InquirerPy checkbox choices (plain dicts) from options."""
+    return [
+        {
+            "name": f"{'[embedded]' if is_embedded else '[external]'} {display_name}",
+            "value": i,
+            "enabled": False,
+        }
+        for i, (_identifier, is_embedded, display_name) in enumerate(options)
+    ]
 
 
 def select_tracks(
@@ -138,6 +153,8 @@ def select_tracks(
     Returns:
         SelectionResult with all selections
     """
+    from InquirerPy import inquirer
+
     console.print("\n" + "=" * 70)
     console.print("[bold]TRACK SELECTION[/bold]", justify="center")
     console.print("=" * 70)
@@ -150,9 +167,9 @@ def select_tracks(
         message="Select audio track(s) to include:",
         choices=audio_choices,
         instruction="(↑/↓ navigate, Space select, Enter confirm)",
-        validate=lambda result: len(result) >= 1,
+        validate=_at_least_one,
         invalid_message="At least one audio track must be selected",
-        transformer=lambda result: f"{len(result)} track(s) selected",
+        transformer=_count_selected,
         cycle=True,
     ).execute()
 
@@ -180,9 +197,7 @@ def select_tracks(
             message="Select subtitle track(s) to include:",
             choices=sub_choices,
             instruction="(↑/↓ navigate, Space select, Enter confirm)",
-            transformer=lambda result: f"{len(result)} track(s) selected"
-            if result
-            else "None",
+            transformer=_count_selected_or_none,
             cycle=True,
         ).execute()
 
@@ -210,7 +225,7 @@ def select_tracks(
     audio_subs, audio_skipped = _handle_gaps(analysis, audio_selections, "audio")
     sub_subs, sub_skipped = _handle_gaps(analysis, subtitle_selections, "subtitle")
 
-    skipped = list(set(audio_skipped) | set(sub_skipped))
+    skipped = sorted({*audio_skipped, *sub_skipped})
 
     return SelectionResult(
         audio_selections=audio_selections,
@@ -232,10 +247,13 @@ def _handle_gaps(
     Returns:
         Tuple of (substitutions dict, skipped episodes list)
     """
+    from InquirerPy import inquirer
+
     substitutions: dict[int, str] = {}
     skipped: list[int] = []
 
-    all_episodes = set(analysis.episodes.keys())
+    # Sorted once and reused for every selection
+    all_episodes = sorted(analysis.episodes)
 
     # Get the sources dict based on track type
     if track_type == "audio":
@@ -252,14 +270,14 @@ def _handle_gaps(
         if not source:
             continue
 
-        source_episodes = set(source.files.keys())
-        missing = all_episodes - source_episodes
+        # source.files is keyed by episode number, so membership is O(1)
+        missing = [ep for ep in all_episodes if ep not in source.files]
 
         if not missing:
             continue
 
         # Find alternatives for missing episodes
-        for ep_num in sorted(missing):
+        for ep_num in missing:
             alternatives = [
                 name
                 for name, src in sources.items()
@@ -6,6 +6,17 @@ from pathlib import Path
 
 from .models import MergePlan, VideoCodec
 
+# Expected output size as a fraction of input size, by video codec
+_OUTPUT_SIZE_RATIOS: dict[VideoCodec, float] = {
+    # Copy mode: output ≈ input (minus filtered tracks)
+    VideoCodec.COPY: 0.9,
+    # HEVC: ~50% compression
+    VideoCodec.HEVC: 0.5,
+    VideoCodec.HEVC_VAAPI: 0.5,
+}
+# H.264: ~70% compression
+_DEFAULT_OUTPUT_SIZE_RATIO = 0.7
+
 
 def estimate_output_size(plan: MergePlan) -> int:
     """
@@ -30,16 +41,8 @@ def estimate_output_size(plan: MergePlan) -> int:
         return total_input_size
 
     codec = plan.jobs[0].video_encoding.codec
-    if codec == VideoCodec.COPY:
-        # Copy mode: output ≈ input (minus filtered tracks)
-        # Assume 90% of input size
-        return int(total_input_size * 0.9)
-    elif codec in (VideoCodec.HEVC, VideoCodec.HEVC_VAAPI):
-        # HEVC: ~50% compression
-        return int(total_input_size * 0.5)
-    else:
-        # H.264: ~70% compression
-        return int(total_input_size * 0.7)
+    ratio = _OUTPUT_SIZE_RATIOS.get(codec, _DEFAULT_OUTPUT_SIZE_RATIO)
+    return int(total_input_size * ratio)
 
 
 def check_disk_space(plan: MergePlan) -> tuple[bool, int, int]:
@@ -75,7 +78,9 @@ def validate_output_directory(directory: Path) -> tuple[bool, str]:
         # Create directory if it doesn't exist
         directory.mkdir(parents=True, exist_ok=True)
 
-        # Try to create a temporary file to test writability
+        # Try to create a temporary file to test writability. os.access is
+        # not enough: it can report writable when a write would still fail
+        # (root on NFS with root_squash, ACL or FUSE mounts)
         test_file = directory / f".anime_mux_test_{os.getpid()}"
         try:
             test_file.touch()
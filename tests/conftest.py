@@ -0,0 +1,25 @@
+"""Shared pytest fixtures."""
+
+from pathlib import Path
+
+import pytest
+
+from anime_mux.models import Episode
+
+
+@pytest.fixture(scope="session")
+def video_file() -> Path:
+    """Primary video file of the episode under test."""
+    return Path("/media/episode01.mkv")
+
+
+@pytest.fixture(scope="session")
+def video_file_str(video_file: Path) -> str:
+    """video_file as it appears in an ffmpeg argv."""
+    return str(video_file)
+
+
+@pytest.fixture(scope="session")
+def episode(video_file: Path) -> Episode:
+    """Episode 1 backed by video_file (read-only; shared across tests)."""
+    return Episode(number=1, video_file=video_file)
@@ -1,10 +1,26 @@
 """Tests for analyzer module."""
 
+import os
+import signal
+import threading
+import time
+from dataclasses import replace
 from pathlib import Path
 
+import pytest
 
-from anime_mux.analyzer import _find_common_tracks, get_track_by_identity
+from anime_mux import analyzer
+from anime_mux.analyzer import (
+    _find_common_tracks,
+    analyze_series,
+    get_track_by_identity,
+)
 from anime_mux.models import Episode, Track, TrackSource, TrackType
+from anime_mux.probe import ProbeError
+
+_TRACK_SOURCE = Path("/test/video.mkv")
+_EP01_FILE = Path("/test/ep01.mkv")
+_EP02_FILE = Path("/test/ep02.mkv")
 
 
 def make_audio_track(
@@ -18,7 +34,7 @@ def make_audio_track(
         language=language,
         title=title,
         source=TrackSource.EMBEDDED,
-        source_file=Path("/test/video.mkv"),
+        source_file=_TRACK_SOURCE,
         channels=channels,
     )
 
@@ -34,49 +50,62 @@ def make_sub_track(
         language=language,
         title=title,
         source=TrackSource.EMBEDDED,
-        source_file=Path("/test/video.mkv"),
+        source_file=_TRACK_SOURCE,
         is_forced=is_forced,
     )
 
 
+# Shared, read-only fixtures: tests only inspect identity keys and membership
+@pytest.fixture(scope="module")
+def jpn_track() -> Track:
+    return make_audio_track("jpn", "Japanese")
+
+
+@pytest.fixture(scope="module")
+def eng_track() -> Track:
+    return make_audio_track("eng", "English")
+
+
+@pytest.fixture(scope="module")
+def jpn_eng_episode(jpn_track: Track, eng_track: Track) -> Episode:
+    """Episode 1 with Japanese and English audio."""
+    return Episode(
+        number=1,
+        video_file=_EP01_FILE,
+        embedded_tracks=[jpn_track, eng_track],
+    )
+
+
+@pytest.fixture(scope="module")
+def jpn_eng_episode_2() -> Episode:
+    """Episode 2 with separately constructed but equivalent tracks."""
+    return Episode(
+        number=2,
+        video_file=_EP02_FILE,
+        embedded_tracks=[
+            make_audio_track("jpn", "Japanese"),
+            make_audio_track("eng", "English"),
+        ],
+    )
+
+
 class TestFindCommonTracks:
     """Tests for _find_common_tracks function."""
 
     def test_empty_episodes(self):
         result = _find_common_tracks([], TrackType.AUDIO)
-        assert result == []
+        assert result == frozenset()
 
-    def test_single_episode(self):
-        ep = Episode(
-            number=1,
-            video_file=Path("/test/ep01.mkv"),
-            embedded_tracks=[
-                make_audio_track("jpn"),
-                make_audio_track("eng"),
-            ],
-        )
-        result = _find_common_tracks([ep], TrackType.AUDIO)
+    def test_single_episode(self, jpn_eng_episode):
+        result = _find_common_tracks([jpn_eng_episode], TrackType.AUDIO)
         assert len(result) == 2
 
-    def test_common_tracks_found(self):
-        jpn_track = make_audio_track("jpn", "Japanese")
-        eng_track = make_audio_track("eng", "English")
-
-        ep1 = Episode(
-            number=1,
-            video_file=Path("/test/ep01.mkv"),
-            embedded_tracks=[jpn_track, eng_track],
+    def test_common_tracks_found(
+        self, jpn_eng_episode, jpn_eng_episode_2, jpn_track, eng_track
+    ):
+        result = _find_common_tracks(
+            [jpn_eng_episode, jpn_eng_episode_2], TrackType.AUDIO
         )
-        ep2 = Episode(
-            number=2,
-            video_file=Path("/test/ep02.mkv"),
-            embedded_tracks=[
-                make_audio_track("jpn", "Japanese"),
-                make_audio_track("eng", "English"),
-            ],
-        )
-
-        result = _find_common_tracks([ep1, ep2], TrackType.AUDIO)
         assert len(result) == 2
         assert jpn_track.identity_key in result
         assert eng_track.identity_key in result
@@ -84,46 +113,52 @@ class TestFindCommonTracks:
     def test_no_common_tracks(self):
         ep1 = Episode(
             number=1,
-            video_file=Path("/test/ep01.mkv"),
+            video_file=_EP01_FILE,
             embedded_tracks=[make_audio_track("jpn")],
         )
         ep2 = Episode(
             number=2,
-            video_file=Path("/test/ep02.mkv"),
+            video_file=_EP02_FILE,
             embedded_tracks=[make_audio_track("eng")],
         )
 
         result = _find_common_tracks([ep1, ep2], TrackType.AUDIO)
-        assert result == []
+        assert result == frozenset()
 
-    def test_partial_common_tracks(self):
-        jpn_track = make_audio_track("jpn", "Japanese")
-
-        ep1 = Episode(
-            number=1,
-            video_file=Path("/test/ep01.mkv"),
-            embedded_tracks=[
-                jpn_track,
-                make_audio_track("eng", "English"),
-            ],
-        )
+    def test_partial_common_tracks(self, jpn_eng_episode, jpn_track):
         ep2 = Episode(
             number=2,
-            video_file=Path("/test/ep02.mkv"),
+            video_file=_EP02_FILE,
             embedded_tracks=[
                 make_audio_track("jpn", "Japanese"),
                 make_audio_track("rus", "Russian"),
             ],
         )
 
-        result = _find_common_tracks([ep1, ep2], TrackType.AUDIO)
+        result = _find_common_tracks([jpn_eng_episode, ep2], TrackType.AUDIO)
         assert len(result) == 1
         assert jpn_track.identity_key in result
 
+    def test_duplicate_track_counted_once_per_episode(self):
+        """A key repeated within one episode does not stand in for another."""
+        ep1 = Episode(
+            number=1,
+            video_file=_EP01_FILE,
+            embedded_tracks=[make_audio_track("jpn"), make_audio_track("jpn")],
+        )
+        ep2 = Episode(
+            number=2,
+            video_file=_EP02_FILE,
+            embedded_tracks=[make_audio_track("eng")],
+        )
+
+        result = _find_common_tracks([ep1, ep2], TrackType.AUDIO)
+        assert result == frozenset()
+
     def test_filters_by_track_type(self):
         ep = Episode(
             number=1,
-            video_file=Path("/test/ep01.mkv"),
+            video_file=_EP01_FILE,
             embedded_tracks=[
                 make_audio_track("jpn"),
                 make_sub_track("eng"),
@@ -140,34 +175,32 @@ class TestFindCommonTracks:
 class TestGetTrackByIdentity:
     """Tests for get_track_by_identity function."""
 
-    def test_finds_track(self):
-        jpn_track = make_audio_track("jpn", "Japanese")
-        eng_track = make_audio_track("eng", "English")
-
-        ep = Episode(
-            number=1,
-            video_file=Path("/test/ep01.mkv"),
-            embedded_tracks=[jpn_track, eng_track],
-        )
-
-        result = get_track_by_identity(ep, jpn_track.identity_key)
+    def test_finds_track(self, jpn_eng_episode, jpn_track):
+        result = get_track_by_identity(jpn_eng_episode, jpn_track.identity_key)
         assert result is not None
         assert result.language == "jpn"
 
-    def test_not_found(self):
+    def test_not_found(self, jpn_eng_episode):
+        result = get_track_by_identity(jpn_eng_episode, "nonexistent|key")
+        assert result is None
+
+    def test_duplicate_keys_returns_first(self):
+        first = make_audio_track("jpn", "Japanese")
+        second = replace(first, index=1)
+
         ep = Episode(
             number=1,
-            video_file=Path("/test/ep01.mkv"),
-            embedded_tracks=[make_audio_track("jpn")],
+            video_file=_EP01_FILE,
+            embedded_tracks=[first, second],
         )
 
-        result = get_track_by_identity(ep, "nonexistent|key")
-        assert result is None
+        result = get_track_by_identity(ep, first.identity_key)
+        assert result is first
 
     def test_empty_tracks(self):
         ep = Episode(
             number=1,
-            video_file=Path("/test/ep01.mkv"),
+            video_file=_EP01_FILE,
             embedded_tracks=[],
         )
 
@@ -208,3 +241,80 @@ class TestTrackIdentityKey:
         track1 = make_audio_track("jpn", "Japanese", channels=2)
         track2 = make_audio_track("jpn", "Japanese", channels=6)
         assert track1.identity_key != track2.identity_key
+
+
+class TestAnalyzeSeriesProbing:
+    """Tests for concurrent video probing in analyze_series."""
+
+    # Episode -> audio language in its fake probe; episode 2 fails to probe
+    _LANGUAGES = {1: "jpn", 3: "eng"}
+
+    @pytest.fixture
+    def series_dir(self, tmp_path: Path) -> Path:
+        for i in range(1, 4):
+            (tmp_path / f"Series - {i:02d}.mkv").touch()
+        return tmp_path
+
+    @pytest.fixture
+    def fake_probe(self, monkeypatch):
+        """Stub probe_file: later episodes finish first, episode 2 fails."""
+
+        def probe_file(path: Path) -> dict:
+            ep_num = int(path.stem[-2:])
+            # Earlier episodes take longer, so completion order is reversed
+            time.sleep(0.02 * (3 - ep_num))
+            if ep_num == 2:
+                raise ProbeError(f"ffprobe failed for {path.name}")
+            return {
+                "streams": [
+                    {
+                        "index": 1,
+                        "codec_type": "audio",
+                        "codec_name": "aac",
+                        "tags": {"language": self._LANGUAGES[ep_num]},
+                    }
+                ]
+            }
+
+        monkeypatch.setattr(analyzer, "probe_file", probe_file)
+
+    def test_results_in_episode_order(self, series_dir, fake_probe):
+        result = analyze_series(series_dir)
+
+        assert result is not None
+        assert list(result.episodes) == [1, 2, 3]
+        for ep_num, language in self._LANGUAGES.items():
+            episode = result.episodes[ep_num]
+            assert episode.video_file.name == f"Series - {ep_num:02d}.mkv"
+            assert [t.language for t in episode.embedded_tracks] == [language]
+
+    def test_probe_error_warns_and_continues(self, series_dir, fake_probe, capsys):
+        result = analyze_series(series_dir)
+
+        assert result is not None
+        assert result.episodes[2].embedded_tracks == []
+        out = capsys.readouterr().out
+        assert "Warning: ffprobe failed for Series - 02.mkv" in out
+
+    def test_interrupt_cancels_queued_probes(self, series_dir, monkeypatch):
+        probed = []
+        release = threading.Event()
+
+        def probe_file(path: Path) -> dict:
+            probed.append(path.name)
+            # Ctrl-C lands in the main thread while this probe is in flight
+            os.kill(os.getpid(), signal.SIGINT)
+            release.wait(timeout=5)
+            return {"streams": []}
+
+        monkeypatch.setattr(analyzer, "probe_file", probe_file)
+        # One worker, so episodes 2 and 3 are still queued when interrupted
+        monkeypatch.setattr(analyzer.os, "cpu_count", lambda: 1)
+
+        try:
+            with pytest.raises(KeyboardInterrupt):
+                analyze_series(series_dir)
+        finally:
+            release.set()
+
+        assert probed == ["Series - 01.mkv"]
@@ -1,12 +1,15 @@
 """Tests for CLI module."""
 
 import pytest
+import typer
 from typer.testing import CliRunner
 
-from anime_mux.cli import app
+from anime_mux.cli import app, validate_encoding_options
 from anime_mux.constants import VALID_VIDEO_CODECS
 
 runner = CliRunner()
+# Underlying Click command, for invoking without CliRunner's output capture
+command = typer.main.get_command(app)
 
 
 class TestCLIValidation:
@@ -26,81 +29,87 @@ class TestCLIValidation:
         assert "anime-mux" in result.stdout
         assert "Analyze video files" in result.stdout
 
-    def test_invalid_video_codec(self, tmp_path):
-        """Test invalid video codec rejection."""
-        result = runner.invoke(app, [str(tmp_path), "--video-codec", "invalid"])
-        assert result.exit_code == 1
-        assert "Invalid video codec" in result.stdout
-
-    @pytest.mark.parametrize("codec", VALID_VIDEO_CODECS)
-    def test_valid_video_codecs(self, tmp_path, codec):
-        """Test all valid video codecs are accepted."""
-        # Will fail at ffprobe check, but that's after validation
-        result = runner.invoke(app, [str(tmp_path), "--video-codec", codec])
-        # Should not fail on codec validation
-        assert "Invalid video codec" not in result.stdout
-
-    def test_crf_out_of_range(self, tmp_path):
-        """Test CRF value validation."""
-        result = runner.invoke(app, [str(tmp_path), "--crf", "52"])
-        assert result.exit_code == 1
-        assert "between 0 and 51" in result.stdout
-
-    def test_crf_negative(self, tmp_path):
-        """Test CRF negative value validation."""
-        result = runner.invoke(app, [str(tmp_path), "--crf", "-1"])
-        assert result.exit_code == 1
-        assert "between 0 and 51" in result.stdout
-
-    def test_quality_out_of_range(self, tmp_path):
-        """Test quality value validation."""
-        result = runner.invoke(app, [str(tmp_path), "--quality", "-1"])
-        assert result.exit_code == 1
-        assert "between 0 and 51" in result.stdout
-
-    def test_quality_too_high(self, tmp_path):
-        """Test quality value validation."""
-        result = runner.invoke(app, [str(tmp_path), "--quality", "100"])
-        assert result.exit_code == 1
-        assert "between 0 and 51" in result.stdout
-
-    def test_crf_warning_with_copy_codec(self, tmp_path):
-        """Test warning when using CRF with copy codec."""
+    def test_invalid_option_exits_with_error(self, tmp_path, capsys):
+        """Test that a validation error is reported and exits the CLI."""
+        with pytest.raises(SystemExit) as exc_info:
+            command.main(
+                [str(tmp_path), "--video-codec", "invalid"], standalone_mode=False
+            )
+        assert exc_info.value.code == 1
+        assert "Error: Invalid video codec" in capsys.readouterr().out
+
+    def test_option_warning_is_printed(self, tmp_path):
+        """Test that validation warnings are shown before continuing."""
         result = runner.invoke(
             app, [str(tmp_path), "--video-codec", "copy", "--crf", "20"]
         )
         # Will fail at ffprobe, but warning should appear
-        assert "ignored when --video-codec is 'copy'" in result.stdout
+        assert "Warning: --crf is ignored" in result.stdout
 
-    def test_quality_warning_with_copy_codec(self, tmp_path):
-        """Test warning when using quality with copy codec."""
-        result = runner.invoke(
-            app, [str(tmp_path), "--video-codec", "copy", "--quality", "20"]
-        )
-        # Will fail at ffprobe, but warning should appear
-        assert "ignored when --video-codec is 'copy'" in result.stdout
+    def test_directory_must_exist(self):
+        """Test that non-existent directory is rejected."""
+        with pytest.raises(typer.BadParameter) as exc_info:
+            command.main(["/nonexistent/path/anime"], standalone_mode=False)
+        assert "does not exist" in exc_info.value.format_message()
 
-    def test_crf_warning_with_vaapi(self, tmp_path):
-        """Test warning when using CRF with VA-API codec."""
-        result = runner.invoke(
-            app, [str(tmp_path), "--video-codec", "h264-vaapi", "--crf", "20"]
-        )
-        # Will fail at ffprobe, but warning should appear
-        assert "Use --quality for VA-API" in result.stdout
 
-    def test_quality_warning_with_cpu_codec(self, tmp_path):
-        """Test warning when using quality with CPU codec."""
-        result = runner.invoke(
-            app, [str(tmp_path), "--video-codec", "h264", "--quality", "20"]
-        )
-        # Will fail at ffprobe, but warning should appear
-        assert "Use --crf for CPU encoding" in result.stdout
+class TestValidateEncodingOptions:
+    """Test validate_encoding_options without going through the CLI."""
 
-    def test_directory_must_exist(self):
-        """Test that non-existent directory is rejected."""
-        result = runner.invoke(app, ["/nonexistent/path/anime"])
-        # Typer exits with code 2 for invalid paths
-        assert result.exit_code == 2
+    @pytest.mark.parametrize("codec", VALID_VIDEO_CODECS)
+    def test_valid_video_codecs(self, codec):
+        """Test all valid video codecs are accepted."""
+        assert validate_encoding_options(codec, None, None) == (None, [])
+
+    def test_video_codec_case_insensitive(self):
+        assert validate_encoding_options("HEVC", None, None) == (None, [])
+
+    def test_invalid_video_codec(self):
+        error, _ = validate_encoding_options("invalid", None, None)
+        assert error is not None
+        assert "Invalid video codec 'invalid'" in error
+
+    @pytest.mark.parametrize(
+        ("crf", "quality"),
+        [(52, None), (-1, None), (None, -1), (None, 100)],
+        ids=["crf-too-high", "crf-negative", "quality-negative", "quality-too-high"],
+    )
+    def test_value_out_of_range(self, crf, quality):
+        error, _ = validate_encoding_options("h264", crf, quality)
+        assert error is not None
+        assert "between 0 and 51" in error
+
+    @pytest.mark.parametrize(
+        ("codec", "crf", "quality", "expected"),
+        [
+            ("copy", 20, None, "ignored when --video-codec is 'copy'"),
+            ("copy", None, 20, "ignored when --video-codec is 'copy'"),
+            ("h264-vaapi", 20, None, "Use --quality for VA-API"),
+            ("h264", None, 20, "Use --crf for CPU encoding"),
+        ],
+        ids=[
+            "crf-with-copy",
+            "quality-with-copy",
+            "crf-with-vaapi",
+            "quality-with-cpu-codec",
+        ],
+    )
+    def test_option_mismatch_warning(self, codec, crf, quality, expected):
+        error, warnings = validate_encoding_options(codec, crf, quality)
+        assert error is None
+        assert len(warnings) == 1
+        assert expected in warnings[0]
+
+    def test_matching_options_no_warning(self):
+        assert validate_encoding_options("hevc", 22, None) == (None, [])
+        assert validate_encoding_options("hevc-vaapi", None, 24) == (None, [])
+
+    def test_warning_kept_with_later_error(self):
+        """Warnings found before an error are still returned."""
+        error, warnings = validate_encoding_options("copy", 20, 100)
+        assert error is not None
+        assert "--quality must be between" in error
+        assert len(warnings) == 1
 
 
 class TestCLIMisc:
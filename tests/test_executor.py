@@ -1,10 +1,12 @@
 """Tests for executor module."""
 
+from dataclasses import dataclass
 from pathlib import Path
 
+import pytest
+
 from anime_mux.executor import build_ffmpeg_command
 from anime_mux.models import (
-    Episode,
     MergeJob,
     Track,
     TrackSource,
@@ -13,8 +15,22 @@ from anime_mux.models import (
     VideoEncodingConfig,
 )
 
+# The _STR forms are what appear in the argv
+_OUTPUT_PATH = Path("/output/episode01.mkv")
+_AUDIO_FILE = Path("/audio/episode01.mka")
+_SUB_FILE = Path("/subs/episode01.ass")
+_OUTPUT_PATH_STR = str(_OUTPUT_PATH)
+_AUDIO_FILE_STR = str(_AUDIO_FILE)
+_SUB_FILE_STR = str(_SUB_FILE)
+
 
-def make_video_track(source_file: Path, index: int = 0) -> Track:
+def make_video_track(
+    source_file: Path,
+    index: int = 0,
+    width: int | None = None,
+    height: int | None = None,
+    bitrate: int | None = None,
+) -> Track:
     """Helper to create video tracks for testing."""
     return Track(
         index=index,
@@ -24,6 +40,9 @@ def make_video_track(source_file: Path, index: int = 0) -> Track:
         title=None,
         source=TrackSource.EMBEDDED,
         source_file=source_file,
+        width=width,
+        height=height,
+        bitrate=bitrate,
     )
 
 
@@ -64,17 +83,56 @@ def make_sub_track(
     )
 
 
+@dataclass
+class IndexedCommand:
+    """An ffmpeg argv plus a map of each argument to its positions."""
+
+    argv: tuple[str, ...]
+    positions: dict[str, list[int]]
+
+    def has(self, arg: str) -> bool:
+        return arg in self.positions
+
+    def has_all(self, *args: str) -> bool:
+        """Whether every arg is present, checked as one subset test."""
+        return self.positions.keys() >= set(args)
+
+    def has_none(self, *args: str) -> bool:
+        """Whether no arg is present."""
+        return self.positions.keys().isdisjoint(args)
+
+    def count(self, arg: str) -> int:
+        return len(self.positions.get(arg, ()))
+
+    def after(self, flag: str) -> str:
+        """Value following the first occurrence of flag."""
+        return self.argv[self.positions[flag][0] + 1]
+
+    def all_after(self, flag: str) -> list[str]:
+        """Values following every occurrence of flag."""
+        return [self.argv[i + 1] for i in self.positions.get(flag, ())]
+
+
+def index_cmd(cmd: tuple[str, ...]) -> IndexedCommand:
+    """Index a command once so assertions don't rescan it per flag."""
+    positions: dict[str, list[int]] = {}
+    for i, arg in enumerate(cmd):
+        positions.setdefault(arg, []).append(i)
+    return IndexedCommand(cmd, positions)
+
+
+# Attachment mapping from input 0 plus the interleave fix that goes with it
+_ATTACHMENT_FLAGS = ("0:t?", "-max_interleave_delta")
+
+
 class TestBuildFfmpegCommand:
     """Tests for build_ffmpeg_command function."""
 
-    def test_basic_video_audio_copy(self):
+    def test_basic_video_audio_copy(self, video_file, video_file_str, episode):
         """Basic command with video and audio, copy mode."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file, index=0)],
             audio_tracks=[make_audio_track(video_file, index=1)],
             subtitle_tracks=[],
@@ -82,30 +140,29 @@ class TestBuildFfmpegCommand:
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
         assert cmd[0] == "ffmpeg"
-        assert "-y" in cmd
-        assert "-i" in cmd
-        assert str(video_file) in cmd
-        assert "-map" in cmd
-        assert "0:0" in cmd  # video
-        assert "0:1" in cmd  # audio
-        assert "-c:v" in cmd
-        assert "copy" in cmd
-        assert "-c:a" in cmd
+        assert args.has_all(
+            "-y",
+            "-i",
+            video_file_str,
+            "-map",
+            "0:0",  # video
+            "0:1",  # audio
+            "-c:v",
+            "copy",
+            "-c:a",
+        )
         # Audio should be copy (not transcode)
-        idx_ca = cmd.index("-c:a")
-        assert cmd[idx_ca + 1] == "copy"
-        assert str(job.output_path) == cmd[-1]
+        assert args.after("-c:a") == "copy"
+        assert cmd[-1] == _OUTPUT_PATH_STR
 
-    def test_transcode_audio_to_aac(self):
+    def test_transcode_audio_to_aac(self, video_file, episode):
         """Audio transcoding to AAC 256k."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file)],
             audio_tracks=[make_audio_track(video_file)],
             subtitle_tracks=[],
@@ -113,21 +170,17 @@ class TestBuildFfmpegCommand:
         )
 
         cmd = build_ffmpeg_command(job, transcode_audio=True)
+        args = index_cmd(cmd)
 
-        idx_ca = cmd.index("-c:a")
-        assert cmd[idx_ca + 1] == "aac"
-        assert "-b:a" in cmd
-        idx_ba = cmd.index("-b:a")
-        assert cmd[idx_ba + 1] == "256k"
+        assert args.after("-c:a") == "aac"
+        assert args.has("-b:a")
+        assert args.after("-b:a") == "256k"
 
-    def test_multiple_audio_tracks(self):
+    def test_multiple_audio_tracks(self, video_file, episode):
         """Multiple audio tracks with correct dispositions."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file, index=0)],
             audio_tracks=[
                 make_audio_track(video_file, index=1, language="jpn"),
@@ -138,29 +191,25 @@ class TestBuildFfmpegCommand:
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
         # Both audio tracks should be mapped
-        assert "0:1" in cmd
-        assert "0:2" in cmd
+        assert args.has("0:1")
+        assert args.has("0:2")
 
         # First audio track should be default
-        assert "-disposition:a:0" in cmd
-        idx_disp0 = cmd.index("-disposition:a:0")
-        assert cmd[idx_disp0 + 1] == "default"
+        assert args.has("-disposition:a:0")
+        assert args.after("-disposition:a:0") == "default"
 
         # Second audio track should have disposition cleared
-        assert "-disposition:a:1" in cmd
-        idx_disp1 = cmd.index("-disposition:a:1")
-        assert cmd[idx_disp1 + 1] == "0"
+        assert args.has("-disposition:a:1")
+        assert args.after("-disposition:a:1") == "0"
 
-    def test_subtitle_tracks(self):
+    def test_subtitle_tracks(self, video_file, episode):
         """Subtitle tracks are mapped and copied."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file, index=0)],
             audio_tracks=[make_audio_track(video_file, index=1)],
             subtitle_tracks=[make_sub_track(video_file, index=2)],
@@ -168,25 +217,21 @@ class TestBuildFfmpegCommand:
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
-        assert "0:2" in cmd
-        assert "-c:s" in cmd
-        idx_cs = cmd.index("-c:s")
-        assert cmd[idx_cs + 1] == "copy"
+        assert args.has("0:2")
+        assert args.has("-c:s")
+        assert args.after("-c:s") == "copy"
 
         # Subtitle should be default
-        assert "-disposition:s:0" in cmd
-        idx_disp = cmd.index("-disposition:s:0")
-        assert cmd[idx_disp + 1] == "default"
+        assert args.has("-disposition:s:0")
+        assert args.after("-disposition:s:0") == "default"
 
-    def test_multiple_subtitle_tracks(self):
+    def test_multiple_subtitle_tracks(self, video_file, episode):
         """Multiple subtitle tracks with correct dispositions."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file, index=0)],
             audio_tracks=[make_audio_track(video_file, index=1)],
             subtitle_tracks=[
@@ -197,226 +242,201 @@ class TestBuildFfmpegCommand:
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
         # First subtitle default, second cleared
-        assert "-disposition:s:0" in cmd
-        assert "-disposition:s:1" in cmd
-        idx_disp1 = cmd.index("-disposition:s:1")
-        assert cmd[idx_disp1 + 1] == "0"
+        assert args.has("-disposition:s:0")
+        assert args.has("-disposition:s:1")
+        assert args.after("-disposition:s:1") == "0"
 
-    def test_external_audio_file(self):
+    def test_external_audio_file(self, video_file, video_file_str, episode):
         """External audio from separate file."""
-        video_file = Path("/media/episode01.mkv")
-        audio_file = Path("/audio/episode01.mka")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file, index=0)],
             audio_tracks=[
-                make_audio_track(audio_file, index=0, source=TrackSource.EXTERNAL)
+                make_audio_track(_AUDIO_FILE, index=0, source=TrackSource.EXTERNAL)
             ],
             subtitle_tracks=[],
             preserve_attachments=False,
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
         # Both files should be inputs
-        assert str(video_file) in cmd
-        assert str(audio_file) in cmd
+        assert args.has(video_file_str)
+        assert args.has(_AUDIO_FILE_STR)
 
         # Video from input 0, audio from input 1
-        assert "0:0" in cmd  # video
-        assert "1:0" in cmd  # audio from second input
+        assert args.has("0:0")  # video
+        assert args.has("1:0")  # audio from second input
 
-    def test_external_subtitle_file(self):
+    def test_external_subtitle_file(self, video_file, video_file_str, episode):
         """External subtitle from separate file."""
-        video_file = Path("/media/episode01.mkv")
-        sub_file = Path("/subs/episode01.ass")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file, index=0)],
             audio_tracks=[make_audio_track(video_file, index=1)],
             subtitle_tracks=[
-                make_sub_track(sub_file, index=0, source=TrackSource.EXTERNAL)
+                make_sub_track(_SUB_FILE, index=0, source=TrackSource.EXTERNAL)
             ],
             preserve_attachments=False,
         )
 
         cmd = build_ffmpeg_command(job)
-
-        assert str(video_file) in cmd
-        assert str(sub_file) in cmd
-        assert "1:0" in cmd  # subtitle from second input
-
-    def test_preserve_attachments(self):
-        """Attachments are preserved from video file."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
+        args = index_cmd(cmd)
+
+        assert args.has(video_file_str)
+        assert args.has(_SUB_FILE_STR)
+        assert args.has("1:0")  # subtitle from second input
+
+    @pytest.mark.parametrize(
+        "preserve,external_audio,present,absent",
+        [
+            (True, False, _ATTACHMENT_FLAGS, ()),
+            # Interleave fix is critical when audio is from a different input;
+            # attachments still come from the video file (input 0)
+            (True, True, _ATTACHMENT_FLAGS, ()),
+            (False, False, (), _ATTACHMENT_FLAGS),
+        ],
+        ids=["preserve", "preserve-external-audio", "disabled"],
+    )
+    def test_attachment_mapping(
+        self, video_file, episode, preserve, external_audio, present, absent
+    ):
+        """Attachments are mapped from the video file only when preserved."""
+        if external_audio:
+            audio = make_audio_track(_AUDIO_FILE, index=0, source=TrackSource.EXTERNAL)
+        else:
+            audio = make_audio_track(video_file)
 
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file)],
-            audio_tracks=[make_audio_track(video_file)],
+            audio_tracks=[audio],
             subtitle_tracks=[],
-            preserve_attachments=True,
+            preserve_attachments=preserve,
         )
 
-        cmd = build_ffmpeg_command(job)
+        args = index_cmd(build_ffmpeg_command(job))
 
-        # Should map attachments with optional flag
-        assert "0:t?" in cmd
-        # Should include interleave fix
-        assert "-max_interleave_delta" in cmd
-        assert "0" in cmd[cmd.index("-max_interleave_delta") + 1]
-
-    def test_preserve_attachments_with_external_audio(self):
-        """Attachments preserved when audio is from external file."""
-        video_file = Path("/media/episode01.mkv")
-        audio_file = Path("/audio/episode01.mka")
-        episode = Episode(number=1, video_file=video_file)
+        assert args.has_all(*present)
+        assert args.has_none(*absent)
+        if preserve:
+            assert args.after("-max_interleave_delta") == "0"
 
+    def test_high_stream_index_mapped(self, video_file, episode):
+        """Stream indices beyond the precomputed label table still map."""
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file, index=0)],
-            audio_tracks=[
-                make_audio_track(audio_file, index=0, source=TrackSource.EXTERNAL)
-            ],
-            subtitle_tracks=[],
-            preserve_attachments=True,
-        )
-
-        cmd = build_ffmpeg_command(job)
-
-        # Attachments should come from video file (input 0)
-        assert "0:t?" in cmd
-        # Interleave fix is critical when audio is from different input
-        assert "-max_interleave_delta" in cmd
-
-    def test_no_attachments_when_disabled(self):
-        """No attachment mapping when preserve_attachments is False."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        job = MergeJob(
-            episode=episode,
-            output_path=Path("/output/episode01.mkv"),
-            video_tracks=[make_video_track(video_file)],
-            audio_tracks=[make_audio_track(video_file)],
+            audio_tracks=[make_audio_track(video_file, index=40)],
             subtitle_tracks=[],
             preserve_attachments=False,
         )
 
-        cmd = build_ffmpeg_command(job)
+        args = index_cmd(build_ffmpeg_command(job))
 
-        # Should not have attachment mapping
-        assert "0:t?" not in cmd
-        assert "-max_interleave_delta" not in cmd
+        assert args.all_after("-map") == ["0:0", "0:40"]
 
-    def test_mixed_sources(self):
+    def test_mixed_sources(self, video_file, video_file_str, episode):
         """Video, external audio, and external subtitle from different files."""
-        video_file = Path("/media/episode01.mkv")
-        audio_file = Path("/audio/episode01.mka")
-        sub_file = Path("/subs/episode01.ass")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file, index=0)],
             audio_tracks=[
-                make_audio_track(audio_file, index=0, source=TrackSource.EXTERNAL)
+                make_audio_track(_AUDIO_FILE, index=0, source=TrackSource.EXTERNAL)
             ],
             subtitle_tracks=[
-                make_sub_track(sub_file, index=0, source=TrackSource.EXTERNAL)
+                make_sub_track(_SUB_FILE, index=0, source=TrackSource.EXTERNAL)
             ],
             preserve_attachments=True,
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
         # All three files should be inputs
-        inputs = [cmd[i + 1] for i, x in enumerate(cmd) if x == "-i"]
+        inputs = args.all_after("-i")
         assert len(inputs) == 3
-        assert str(video_file) in inputs
-        assert str(audio_file) in inputs
-        assert str(sub_file) in inputs
+        assert set(inputs) == {video_file_str, _AUDIO_FILE_STR, _SUB_FILE_STR}
 
-    def test_output_path_is_last(self):
+    def test_output_path_is_last(self, video_file, episode):
         """Output path is always the last argument."""
-        video_file = Path("/media/episode01.mkv")
-        output_path = Path("/output/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=output_path,
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file)],
             audio_tracks=[make_audio_track(video_file)],
             subtitle_tracks=[],
             preserve_attachments=False,
         )
 
-        cmd = build_ffmpeg_command(job)
+        args = index_cmd(build_ffmpeg_command(job))
 
-        assert cmd[-1] == str(output_path)
+        assert args.argv[-1] == _OUTPUT_PATH_STR
 
-    def test_no_audio_tracks(self):
+    def test_no_audio_tracks(self, video_file, episode):
         """Command works with no audio tracks (edge case)."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file)],
             audio_tracks=[],
             subtitle_tracks=[],
             preserve_attachments=False,
         )
 
-        cmd = build_ffmpeg_command(job)
+        args = index_cmd(build_ffmpeg_command(job))
 
         # Should still have video codec settings
-        assert "-c:v" in cmd
-        assert "-c:a" in cmd  # Audio codec still present (for any audio)
+        assert args.has("-c:v")
+        assert args.has("-c:a")  # Audio codec still present (for any audio)
         # No audio disposition should be set
-        assert "-disposition:a:0" not in cmd
+        assert not args.has("-disposition:a:0")
 
-    def test_no_subtitle_tracks(self):
-        """Command works with no subtitle tracks."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
+    def test_video_only_has_no_dispositions(self, video_file, episode):
+        """No -disposition flags at all without audio or subtitle tracks."""
+        job = MergeJob(
+            episode=episode,
+            output_path=_OUTPUT_PATH,
+            video_tracks=[make_video_track(video_file)],
+            audio_tracks=[],
+            subtitle_tracks=[],
+            preserve_attachments=False,
+        )
+
+        args = index_cmd(build_ffmpeg_command(job))
 
+        assert not any(arg.startswith("-disposition") for arg in args.argv)
+
+    def test_no_subtitle_tracks(self, video_file, episode):
+        """Command works with no subtitle tracks."""
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file)],
             audio_tracks=[make_audio_track(video_file)],
             subtitle_tracks=[],
             preserve_attachments=False,
         )
 
-        cmd = build_ffmpeg_command(job)
+        args = index_cmd(build_ffmpeg_command(job))
 
         # No subtitle disposition should be set
-        assert "-disposition:s:0" not in cmd
+        assert not args.has("-disposition:s:0")
 
-    def test_same_file_not_duplicated_in_inputs(self):
+    def test_same_file_not_duplicated_in_inputs(self, video_file, episode):
         """Same source file is not added multiple times as input."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file, index=0)],
             audio_tracks=[
                 make_audio_track(video_file, index=1),
@@ -429,33 +449,62 @@ class TestBuildFfmpegCommand:
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
         # Count -i occurrences
-        input_count = cmd.count("-i")
+        input_count = args.count("-i")
         assert input_count == 1
 
         # All mappings should reference input 0
-        mappings = [cmd[i + 1] for i, x in enumerate(cmd) if x == "-map"]
+        mappings = args.all_after("-map")
         for m in mappings:
             assert m.startswith("0:")
 
 
+# Full expected commands for one 1080p video + one audio track job; the
+# encoder surfaces are compared whole rather than flag by flag
+_GOLDEN_H264_1080P = tuple(
+    (
+        "ffmpeg -y -i /media/episode01.mkv -map 0:0 -map 0:1"
+        " -c:v libx264 -crf 20 -preset medium -pix_fmt yuv420p"
+        " -c:a copy -c:s copy -disposition:a:0 default /output/episode01.mkv"
+    ).split()
+)
+_GOLDEN_H264_VAAPI_1080P = tuple(
+    (
+        "ffmpeg -y -hwaccel vaapi -hwaccel_device /dev/dri/renderD128"
+        " -hwaccel_output_format vaapi -i /media/episode01.mkv -map 0:0 -map 0:1"
+        " -c:v h264_vaapi -rc_mode CQP -global_quality 22 -bf 0"
+        " -c:a copy -c:s copy -disposition:a:0 default /output/episode01.mkv"
+    ).split()
+)
+# 27 = 1080p base 22 + 5 for HEVC; no B-frame override for HEVC
+_GOLDEN_HEVC_VAAPI_1080P = tuple(
+    (
+        "ffmpeg -y -hwaccel vaapi -hwaccel_device /dev/dri/renderD128"
+        " -hwaccel_output_format vaapi -i /media/episode01.mkv -map 0:0 -map 0:1"
+        " -c:v hevc_vaapi -rc_mode CQP -global_quality 27"
+        " -c:a copy -c:s copy -disposition:a:0 default /output/episode01.mkv"
+    ).split()
+)
+
+
 class TestH264Encoding:
     """Tests for H.264 video encoding in build_ffmpeg_command."""
 
-    def test_h264_encoding_uses_libx264(self):
-        """H.264 encoding uses libx264 codec."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        video_track = make_video_track(video_file, index=0)
-        video_track.width = 1920
-        video_track.height = 1080
-        video_track.bitrate = 8_000_000
+    def test_h264_encoding_full_argv(self, video_file, episode):
+        """1080p H.264: libx264, auto CRF 20, medium preset, yuv420p."""
+        video_track = make_video_track(
+            video_file,
+            index=0,
+            width=1920,
+            height=1080,
+            bitrate=8_000_000,  # typical bitrate
+        )
 
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[video_track],
             audio_tracks=[make_audio_track(video_file, index=1)],
             subtitle_tracks=[],
@@ -463,22 +512,13 @@ class TestH264Encoding:
             video_encoding=VideoEncodingConfig(codec=VideoCodec.H264),
         )
 
-        cmd = build_ffmpeg_command(job)
-
-        idx_cv = cmd.index("-c:v")
-        assert cmd[idx_cv + 1] == "libx264"
-        assert "-crf" in cmd
-        assert "-preset" in cmd
-        assert "-pix_fmt" in cmd
+        assert build_ffmpeg_command(job) == _GOLDEN_H264_1080P
 
-    def test_h264_encoding_with_explicit_crf(self):
+    def test_h264_encoding_with_explicit_crf(self, video_file, episode):
         """Explicit CRF value is used."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file)],
             audio_tracks=[make_audio_track(video_file)],
             subtitle_tracks=[],
@@ -487,83 +527,15 @@ class TestH264Encoding:
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
-        idx_crf = cmd.index("-crf")
-        assert cmd[idx_crf + 1] == "18"
-
-    def test_h264_encoding_auto_crf_1080p(self):
-        """Auto CRF for 1080p uses correct value."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        video_track = make_video_track(video_file, index=0)
-        video_track.width = 1920
-        video_track.height = 1080
-        video_track.bitrate = 8_000_000  # typical bitrate
-
-        job = MergeJob(
-            episode=episode,
-            output_path=Path("/output/episode01.mkv"),
-            video_tracks=[video_track],
-            audio_tracks=[make_audio_track(video_file, index=1)],
-            subtitle_tracks=[],
-            preserve_attachments=False,
-            video_encoding=VideoEncodingConfig(codec=VideoCodec.H264),
-        )
-
-        cmd = build_ffmpeg_command(job)
-
-        idx_crf = cmd.index("-crf")
-        assert cmd[idx_crf + 1] == "20"  # base CRF for 1080p
-
-    def test_h264_encoding_preset_medium(self):
-        """H.264 encoding uses medium preset."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        job = MergeJob(
-            episode=episode,
-            output_path=Path("/output/episode01.mkv"),
-            video_tracks=[make_video_track(video_file)],
-            audio_tracks=[make_audio_track(video_file)],
-            subtitle_tracks=[],
-            preserve_attachments=False,
-            video_encoding=VideoEncodingConfig(codec=VideoCodec.H264),
-        )
-
-        cmd = build_ffmpeg_command(job)
-
-        idx_preset = cmd.index("-preset")
-        assert cmd[idx_preset + 1] == "medium"
-
-    def test_h264_encoding_yuv420p_pixel_format(self):
-        """H.264 encoding uses yuv420p pixel format for compatibility."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        job = MergeJob(
-            episode=episode,
-            output_path=Path("/output/episode01.mkv"),
-            video_tracks=[make_video_track(video_file)],
-            audio_tracks=[make_audio_track(video_file)],
-            subtitle_tracks=[],
-            preserve_attachments=False,
-            video_encoding=VideoEncodingConfig(codec=VideoCodec.H264),
-        )
-
-        cmd = build_ffmpeg_command(job)
-
-        idx_pix = cmd.index("-pix_fmt")
-        assert cmd[idx_pix + 1] == "yuv420p"
+        assert args.after("-crf") == "18"
 
-    def test_copy_mode_no_encoding_params(self):
+    def test_copy_mode_no_encoding_params(self, video_file, episode):
         """Copy mode doesn't add encoding parameters."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file)],
             audio_tracks=[make_audio_track(video_file)],
             subtitle_tracks=[],
@@ -571,22 +543,18 @@ class TestH264Encoding:
             video_encoding=VideoEncodingConfig(codec=VideoCodec.COPY),
         )
 
-        cmd = build_ffmpeg_command(job)
+        args = index_cmd(build_ffmpeg_command(job))
 
-        idx_cv = cmd.index("-c:v")
-        assert cmd[idx_cv + 1] == "copy"
-        assert "-crf" not in cmd
-        assert "-preset" not in cmd
-        assert "-pix_fmt" not in cmd
+        assert args.after("-c:v") == "copy"
+        assert not args.has("-crf")
+        assert not args.has("-preset")
+        assert not args.has("-pix_fmt")
 
-    def test_default_encoding_is_copy(self):
+    def test_default_encoding_is_copy(self, video_file, episode):
         """Default video encoding config uses copy mode."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file)],
             audio_tracks=[make_audio_track(video_file)],
             subtitle_tracks=[],
@@ -594,10 +562,16 @@ class TestH264Encoding:
             # No video_encoding specified, uses default
         )
 
-        cmd = build_ffmpeg_command(job)
+        args = index_cmd(build_ffmpeg_command(job))
+
+        assert args.after("-c:v") == "copy"
 
-        idx_cv = cmd.index("-c:v")
-        assert cmd[idx_cv + 1] == "copy"
+
+# Stateless configs shared by the auto-calculation tests below
+_H264_CFG = VideoEncodingConfig(codec=VideoCodec.H264)
+_HEVC_CFG = VideoEncodingConfig(codec=VideoCodec.HEVC)
+_HEVC_VAAPI_CFG = VideoEncodingConfig(codec=VideoCodec.HEVC_VAAPI)
+_H264_VAAPI_CFG = VideoEncodingConfig(codec=VideoCodec.H264_VAAPI)
 
 
 class TestVideoEncodingConfig:
@@ -608,97 +582,59 @@ class TestVideoEncodingConfig:
         config = VideoEncodingConfig(codec=VideoCodec.H264, crf=18)
         assert config.calculate_crf(1920, 1080, 10_000_000, VideoCodec.H264) == 18
 
-    def test_4k_base_crf(self):
-        """4K resolution uses CRF 18 for H.264."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        crf = config.calculate_crf(3840, 2160, None, VideoCodec.H264)
-        assert crf == 18
-
-    def test_1080p_base_crf(self):
-        """1080p resolution uses CRF 20 for H.264."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        crf = config.calculate_crf(1920, 1080, None, VideoCodec.H264)
-        assert crf == 20
-
-    def test_720p_base_crf(self):
-        """720p resolution uses CRF 22 for H.264."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        crf = config.calculate_crf(1280, 720, None, VideoCodec.H264)
-        assert crf == 22
-
-    def test_480p_base_crf(self):
-        """480p resolution uses CRF 24 for H.264."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        crf = config.calculate_crf(854, 480, None, VideoCodec.H264)
-        assert crf == 24
-
-    def test_low_res_base_crf(self):
-        """Low resolution (<480p) uses CRF 26 for H.264."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        crf = config.calculate_crf(640, 360, None, VideoCodec.H264)
-        assert crf == 26
-
-    def test_high_bitrate_lowers_crf(self):
-        """Very high bitrate source lowers CRF by 2."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        # 1080p with very high bitrate (20 Mbps = 2.5x typical 8 Mbps)
-        crf = config.calculate_crf(1920, 1080, 20_000_000, VideoCodec.H264)
-        assert crf == 18  # base 20 - 2
-
-    def test_moderately_high_bitrate_lowers_crf(self):
-        """Moderately high bitrate source lowers CRF by 1."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        # 1080p with high bitrate (13 Mbps = 1.6x typical)
-        crf = config.calculate_crf(1920, 1080, 13_000_000, VideoCodec.H264)
-        assert crf == 19  # base 20 - 1
-
-    def test_low_bitrate_raises_crf(self):
-        """Low bitrate source raises CRF by 1."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        # 1080p with low bitrate (3 Mbps = 0.375x typical)
-        crf = config.calculate_crf(1920, 1080, 3_000_000, VideoCodec.H264)
-        assert crf == 21  # base 20 + 1
-
-    def test_typical_bitrate_uses_base_crf(self):
-        """Typical bitrate uses base CRF unchanged."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        # 1080p with typical bitrate (8 Mbps)
-        crf = config.calculate_crf(1920, 1080, 8_000_000, VideoCodec.H264)
-        assert crf == 20  # base, no adjustment
+    @pytest.mark.parametrize(
+        "config,width,height,bitrate,codec,expected",
+        [
+            (_H264_CFG, 3840, 2160, None, VideoCodec.H264, 18),
+            (_H264_CFG, 1920, 1080, None, VideoCodec.H264, 20),
+            (_H264_CFG, 1280, 720, None, VideoCodec.H264, 22),
+            (_H264_CFG, 854, 480, None, VideoCodec.H264, 24),
+            (_H264_CFG, 640, 360, None, VideoCodec.H264, 26),
+            # 20 Mbps = 2.5x typical 8 Mbps: base 20 - 2
+            (_H264_CFG, 1920, 1080, 20_000_000, VideoCodec.H264, 18),
+            # 13 Mbps = 1.6x typical: base 20 - 1
+            (_H264_CFG, 1920, 1080, 13_000_000, VideoCodec.H264, 19),
+            # 3 Mbps = 0.375x typical: base 20 + 1
+            (_H264_CFG, 1920, 1080, 3_000_000, VideoCodec.H264, 21),
+            # Typical bitrate: base, no adjustment
+            (_H264_CFG, 1920, 1080, 8_000_000, VideoCodec.H264, 20),
+            # None dimensions use 1080p defaults
+            (_H264_CFG, None, None, None, VideoCodec.H264, 20),
+            # HEVC uses +5 CRF offset for equivalent quality
+            (_HEVC_CFG, 1920, 1080, None, VideoCodec.HEVC, 25),
+            (_HEVC_VAAPI_CFG, 1920, 1080, None, VideoCodec.HEVC_VAAPI, 25),
+        ],
+        ids=[
+            "4k",
+            "1080p",
+            "720p",
+            "480p",
+            "low-res",
+            "high-bitrate",
+            "moderately-high-bitrate",
+            "low-bitrate",
+            "typical-bitrate",
+            "none-dimensions",
+            "hevc",
+            "hevc-vaapi",
+        ],
+    )
+    def test_auto_crf(self, config, width, height, bitrate, codec, expected):
+        """CRF is derived from resolution, bitrate and codec."""
+        assert config.calculate_crf(width, height, bitrate, codec) == expected
 
     def test_crf_clamped_minimum(self):
         """CRF is clamped to minimum 0."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
         # 4K with extremely high bitrate
-        crf = config.calculate_crf(3840, 2160, 100_000_000, VideoCodec.H264)
+        crf = _H264_CFG.calculate_crf(3840, 2160, 100_000_000, VideoCodec.H264)
         assert crf >= 0
 
     def test_crf_clamped_maximum(self):
         """CRF is clamped to maximum 51."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
         # Very low res with very low bitrate
-        crf = config.calculate_crf(320, 240, 100_000, VideoCodec.H264)
+        crf = _H264_CFG.calculate_crf(320, 240, 100_000, VideoCodec.H264)
         assert crf <= 51
 
-    def test_none_dimensions_uses_defaults(self):
-        """None dimensions use 1080p defaults."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264)
-        crf = config.calculate_crf(None, None, None, VideoCodec.H264)
-        assert crf == 20  # 1080p default
-
-    def test_hevc_uses_higher_crf(self):
-        """HEVC uses +5 CRF offset for equivalent quality."""
-        config = VideoEncodingConfig(codec=VideoCodec.HEVC)
-        # 1080p H.264 would be 20, HEVC should be 25
-        crf = config.calculate_crf(1920, 1080, None, VideoCodec.HEVC)
-        assert crf == 25  # base 20 + 5
-
-    def test_hevc_vaapi_uses_higher_crf(self):
-        """HEVC VA-API also uses +5 CRF offset."""
-        config = VideoEncodingConfig(codec=VideoCodec.HEVC_VAAPI)
-        crf = config.calculate_crf(1920, 1080, None, VideoCodec.HEVC_VAAPI)
-        assert crf == 25  # base 20 + 5
-
 
 class TestVideoEncodingConfigQuality:
     """Tests for VideoEncodingConfig quality calculation (VA-API)."""
@@ -711,142 +647,54 @@ class TestVideoEncodingConfigQuality:
             == 20
         )
 
-    def test_1080p_base_quality_h264_vaapi(self):
-        """1080p H.264 VA-API uses quality 22."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264_VAAPI)
-        quality = config.calculate_quality(1920, 1080, None, VideoCodec.H264_VAAPI)
-        assert quality == 22
-
-    def test_1080p_base_quality_hevc_vaapi(self):
-        """1080p HEVC VA-API uses quality 27 (22 + 5)."""
-        config = VideoEncodingConfig(codec=VideoCodec.HEVC_VAAPI)
-        quality = config.calculate_quality(1920, 1080, None, VideoCodec.HEVC_VAAPI)
-        assert quality == 27  # base 22 + 5 for HEVC
-
-    def test_4k_base_quality(self):
-        """4K H.264 VA-API uses quality 20."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264_VAAPI)
-        quality = config.calculate_quality(3840, 2160, None, VideoCodec.H264_VAAPI)
-        assert quality == 20
-
-    def test_720p_base_quality(self):
-        """720p H.264 VA-API uses quality 24."""
-        config = VideoEncodingConfig(codec=VideoCodec.H264_VAAPI)
-        quality = config.calculate_quality(1280, 720, None, VideoCodec.H264_VAAPI)
-        assert quality == 24
+    @pytest.mark.parametrize(
+        "config,width,height,codec,expected",
+        [
+            (_H264_VAAPI_CFG, 1920, 1080, VideoCodec.H264_VAAPI, 22),
+            # base 22 + 5 for HEVC
+            (_HEVC_VAAPI_CFG, 1920, 1080, VideoCodec.HEVC_VAAPI, 27),
+            (_H264_VAAPI_CFG, 3840, 2160, VideoCodec.H264_VAAPI, 20),
+            (_H264_VAAPI_CFG, 1280, 720, VideoCodec.H264_VAAPI, 24),
+        ],
+        ids=["1080p-h264", "1080p-hevc", "4k", "720p"],
+    )
+    def test_auto_quality(self, config, width, height, codec, expected):
+        """Quality is derived from resolution and codec."""
+        assert config.calculate_quality(width, height, None, codec) == expected
 
 
 class TestVaapiEncoding:
     """Tests for VA-API video encoding in build_ffmpeg_command."""
 
-    def test_h264_vaapi_uses_cqp_mode(self):
-        """H.264 VA-API uses -rc_mode CQP."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        video_track = make_video_track(video_file, index=0)
-        video_track.width = 1920
-        video_track.height = 1080
-
-        job = MergeJob(
-            episode=episode,
-            output_path=Path("/output/episode01.mkv"),
-            video_tracks=[video_track],
-            audio_tracks=[make_audio_track(video_file, index=1)],
-            subtitle_tracks=[],
-            preserve_attachments=False,
-            video_encoding=VideoEncodingConfig(codec=VideoCodec.H264_VAAPI),
-        )
-
-        cmd = build_ffmpeg_command(job)
-
-        assert "-rc_mode" in cmd
-        idx_rc = cmd.index("-rc_mode")
-        assert cmd[idx_rc + 1] == "CQP"
-
-    def test_h264_vaapi_uses_global_quality(self):
-        """H.264 VA-API uses -global_quality instead of -qp."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        video_track = make_video_track(video_file, index=0)
-        video_track.width = 1920
-        video_track.height = 1080
-
-        job = MergeJob(
-            episode=episode,
-            output_path=Path("/output/episode01.mkv"),
-            video_tracks=[video_track],
-            audio_tracks=[make_audio_track(video_file, index=1)],
-            subtitle_tracks=[],
-            preserve_attachments=False,
-            video_encoding=VideoEncodingConfig(codec=VideoCodec.H264_VAAPI),
-        )
-
-        cmd = build_ffmpeg_command(job)
-
-        assert "-global_quality" in cmd
-        assert "-qp" not in cmd
-        idx_gq = cmd.index("-global_quality")
-        assert cmd[idx_gq + 1] == "22"  # 1080p base quality
-
-    def test_hevc_vaapi_uses_cqp_mode(self):
-        """HEVC VA-API uses -rc_mode CQP."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        video_track = make_video_track(video_file, index=0)
-        video_track.width = 1920
-        video_track.height = 1080
-
-        job = MergeJob(
-            episode=episode,
-            output_path=Path("/output/episode01.mkv"),
-            video_tracks=[video_track],
-            audio_tracks=[make_audio_track(video_file, index=1)],
-            subtitle_tracks=[],
-            preserve_attachments=False,
-            video_encoding=VideoEncodingConfig(codec=VideoCodec.HEVC_VAAPI),
-        )
-
-        cmd = build_ffmpeg_command(job)
-
-        assert "-rc_mode" in cmd
-        idx_rc = cmd.index("-rc_mode")
-        assert cmd[idx_rc + 1] == "CQP"
-
-    def test_hevc_vaapi_uses_higher_quality_value(self):
-        """HEVC VA-API uses quality 27 for 1080p (22 + 5 HEVC offset)."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        video_track = make_video_track(video_file, index=0)
-        video_track.width = 1920
-        video_track.height = 1080
+    @pytest.mark.parametrize(
+        "codec,expected",
+        [
+            (VideoCodec.H264_VAAPI, _GOLDEN_H264_VAAPI_1080P),
+            (VideoCodec.HEVC_VAAPI, _GOLDEN_HEVC_VAAPI_1080P),
+        ],
+        ids=["h264", "hevc"],
+    )
+    def test_vaapi_full_argv(self, video_file, episode, codec, expected):
+        """1080p VA-API: hwaccel decode, CQP mode and -global_quality (not -qp)."""
+        video_track = make_video_track(video_file, index=0, width=1920, height=1080)
 
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[video_track],
             audio_tracks=[make_audio_track(video_file, index=1)],
             subtitle_tracks=[],
             preserve_attachments=False,
-            video_encoding=VideoEncodingConfig(codec=VideoCodec.HEVC_VAAPI),
+            video_encoding=VideoEncodingConfig(codec=codec),
         )
 
-        cmd = build_ffmpeg_command(job)
-
-        idx_gq = cmd.index("-global_quality")
-        assert cmd[idx_gq + 1] == "27"  # 1080p base 22 + 5 for HEVC
+        assert build_ffmpeg_command(job) == expected
 
-    def test_vaapi_explicit_quality(self):
+    def test_vaapi_explicit_quality(self, video_file, episode):
         """Explicit quality value is used in VA-API command."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[make_video_track(video_file)],
             audio_tracks=[make_audio_track(video_file)],
             subtitle_tracks=[],
@@ -855,26 +703,21 @@ class TestVaapiEncoding:
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
-        idx_gq = cmd.index("-global_quality")
-        assert cmd[idx_gq + 1] == "18"
+        assert args.after("-global_quality") == "18"
 
 
 class TestHevcEncoding:
     """Tests for HEVC software encoding."""
 
-    def test_hevc_uses_higher_crf(self):
+    def test_hevc_uses_higher_crf(self, video_file, episode):
         """HEVC encoding uses CRF 25 for 1080p (20 + 5)."""
-        video_file = Path("/media/episode01.mkv")
-        episode = Episode(number=1, video_file=video_file)
-
-        video_track = make_video_track(video_file, index=0)
-        video_track.width = 1920
-        video_track.height = 1080
+        video_track = make_video_track(video_file, index=0, width=1920, height=1080)
 
         job = MergeJob(
             episode=episode,
-            output_path=Path("/output/episode01.mkv"),
+            output_path=_OUTPUT_PATH,
             video_tracks=[video_track],
             audio_tracks=[make_audio_track(video_file, index=1)],
             subtitle_tracks=[],
@@ -883,8 +726,7 @@ class TestHevcEncoding:
         )
 
         cmd = build_ffmpeg_command(job)
+        args = index_cmd(cmd)
 
-        idx_cv = cmd.index("-c:v")
-        assert cmd[idx_cv + 1] == "libx265"
-        idx_crf = cmd.index("-crf")
-        assert cmd[idx_crf + 1] == "25"  # base 20 + 5 for HEVC
+        assert args.after("-c:v") == "libx265"
+        assert args.after("-crf") == "25"  # base 20 + 5 for HEVC
@@ -2,10 +2,14 @@
 
 from pathlib import Path
 
+import pytest
+
 from anime_mux.models import (
     AnalysisResult,
     Episode,
     ExternalSource,
+    MergeJob,
+    MergePlan,
     Track,
     TrackSource,
     TrackType,
@@ -18,6 +22,15 @@ from anime_mux.planner import (
 )
 from anime_mux.selector import SelectionResult, TrackSelection
 
+_OUTPUT_DIR = Path("/output")
+_EP_FILES = {i: Path(f"/media/ep{i:02d}.mkv") for i in range(1, 4)}
+_EP01 = _EP_FILES[1]
+_AUDIO_EP01 = Path("/audio/ep01.mka")
+_SUB_EP01 = Path("/subs/ep01.ass")
+_ALT_AUDIO_EP01 = Path("/audio/alt/ep01.mka")
+_ALT_SUB_EP01 = Path("/subs/alt/ep01.ass")
+_RELEASE_EP01 = Path("/media/[SubGroup] Series - 01 [1080p].mkv")
+
 
 def make_video_track(source_file: Path, index: int = 0) -> Track:
     """Helper to create video tracks for testing."""
@@ -74,6 +87,20 @@ def make_sub_track(
     )
 
 
+def first_value(mapping: dict[int, Episode]) -> Episode:
+    """Helper to get the first-inserted value without copying the view."""
+    return next(iter(mapping.values()))
+
+
+def make_track_selection(
+    identifier: str, is_embedded: bool, display_name: str
+) -> TrackSelection:
+    """Helper to create track selections for testing."""
+    return TrackSelection(
+        identifier=identifier, is_embedded=is_embedded, display_name=display_name
+    )
+
+
 def make_episode(
     number: int,
     video_file: Path,
@@ -135,12 +162,130 @@ def make_selection(
     )
 
 
+def plan_single_episode(
+    video_file: Path,
+    audio_tracks: list[Track] | None = None,
+    sub_tracks: list[Track] | None = None,
+    external_audio: dict[str, Track] | None = None,
+    external_subs: dict[str, Track] | None = None,
+    select_subtitles: bool = True,
+) -> MergePlan:
+    """Helper to plan one episode, selecting every track it offers."""
+    audio_tracks = audio_tracks or []
+    sub_tracks = sub_tracks or []
+    external_audio = external_audio or {}
+    external_subs = external_subs or {}
+
+    ep = make_episode(
+        1,
+        video_file,
+        audio_tracks=audio_tracks,
+        sub_tracks=sub_tracks,
+        external_audio=external_audio,
+        external_subs=external_subs,
+    )
+    analysis = make_analysis(
+        {1: ep},
+        common_audio=[t.identity_key for t in audio_tracks],
+        common_subs=[t.identity_key for t in sub_tracks],
+    )
+    audio_selections = [
+        make_track_selection(t.identity_key, True, "Audio") for t in audio_tracks
+    ] + [make_track_selection(name, False, name) for name in external_audio]
+    subtitle_selections = [
+        make_track_selection(t.identity_key, True, "Subtitles") for t in sub_tracks
+    ] + [make_track_selection(name, False, name) for name in external_subs]
+    selection = make_selection(
+        audio_selections=audio_selections,
+        subtitle_selections=subtitle_selections if select_subtitles else [],
+    )
+
+    return build_merge_plan(analysis, selection, _OUTPUT_DIR)
+
+
+def describe_job(job: MergeJob) -> dict[str, object]:
+    """Flatten the parts of a job the plan-variant cases assert on."""
+    return {
+        "episode": job.episode.number,
+        "video_tracks": len(job.video_tracks),
+        "audio_sources": [t.source for t in job.audio_tracks],
+        "subtitle_sources": [t.source for t in job.subtitle_tracks],
+        "output_path": job.output_path,
+        "preserve_attachments": job.preserve_attachments,
+    }
+
+
+# Single-episode plan variants: planner kwargs -> expected job fields
+_EMBEDDED = TrackSource.EMBEDDED
+_EXTERNAL = TrackSource.EXTERNAL
+_PLAN_VARIANTS = [
+    pytest.param(
+        dict(
+            video_file=_EP01,
+            audio_tracks=[make_audio_track(_EP01, language="jpn", title="Japanese")],
+            sub_tracks=[make_sub_track(_EP01, language="eng", title="English")],
+        ),
+        {
+            "episode": 1,
+            "video_tracks": 1,
+            "audio_sources": [_EMBEDDED],
+            "subtitle_sources": [_EMBEDDED],
+            "output_path": _OUTPUT_DIR / "ep01.mkv",
+        },
+        id="basic",
+    ),
+    pytest.param(
+        dict(video_file=_EP01, audio_tracks=[make_audio_track(_EP01)]),
+        {"preserve_attachments": True},
+        id="preserve_attachments_default_true",
+    ),
+    pytest.param(
+        dict(
+            video_file=_RELEASE_EP01,
+            audio_tracks=[make_audio_track(_RELEASE_EP01)],
+        ),
+        {"output_path": _OUTPUT_DIR / "[SubGroup] Series - 01 [1080p].mkv"},
+        id="output_path_preserves_filename",
+    ),
+    pytest.param(
+        dict(
+            video_file=_EP01,
+            external_audio={
+                "RuDub": make_audio_track(_AUDIO_EP01, language="rus", source=_EXTERNAL)
+            },
+        ),
+        {"audio_sources": [_EXTERNAL]},
+        id="external_audio",
+    ),
+    pytest.param(
+        dict(
+            video_file=_EP01,
+            audio_tracks=[make_audio_track(_EP01)],
+            sub_tracks=[make_sub_track(_EP01)],
+            select_subtitles=False,
+        ),
+        {"subtitle_sources": []},
+        id="no_subtitles_selected",
+    ),
+    pytest.param(
+        dict(
+            video_file=_EP01,
+            audio_tracks=[make_audio_track(_EP01, language="jpn", title="Japanese")],
+            external_subs={
+                "EngSubs": make_sub_track(_SUB_EP01, language="eng", source=_EXTERNAL)
+            },
+        ),
+        {"audio_sources": [_EMBEDDED], "subtitle_sources": [_EXTERNAL]},
+        id="mixed_embedded_and_external",
+    ),
+]
+
+
 class TestGetVideoTrack:
     """Tests for _get_video_track function."""
 
     def test_finds_video_track(self):
-        video_file = Path("/media/ep01.mkv")
-        ep = make_episode(1, video_file)
+        ep = make_episode(1, _EP01)
 
         result = _get_video_track(ep)
 
@@ -148,11 +293,10 @@ class TestGetVideoTrack:
         assert result.track_type == TrackType.VIDEO
 
     def test_returns_none_when_no_video(self):
-        video_file = Path("/media/ep01.mkv")
         ep = Episode(
             number=1,
-            video_file=video_file,
-            embedded_tracks=[make_audio_track(video_file)],
+            video_file=_EP01,
+            embedded_tracks=[make_audio_track(_EP01)],
         )
 
         result = _get_video_track(ep)
@@ -164,17 +308,12 @@ class TestResolveAudioTracks:
     """Tests for _resolve_audio_tracks function."""
 
     def test_resolve_embedded_audio(self):
-        video_file = Path("/media/ep01.mkv")
-        audio_track = make_audio_track(video_file, language="jpn", title="Japanese")
-        ep = make_episode(1, video_file, audio_tracks=[audio_track])
+        audio_track = make_audio_track(_EP01, language="jpn", title="Japanese")
+        ep = make_episode(1, _EP01, audio_tracks=[audio_track])
         analysis = make_analysis({1: ep}, common_audio=[audio_track.identity_key])
         selection = make_selection(
             audio_selections=[
-                TrackSelection(
-                    identifier=audio_track.identity_key,
-                    is_embedded=True,
-                    display_name="Japanese",
-                )
+                make_track_selection(audio_track.identity_key, True, "Japanese")
             ]
         )
 
@@ -184,21 +323,13 @@ class TestResolveAudioTracks:
         assert result[0].language == "jpn"
 
     def test_resolve_external_audio(self):
-        video_file = Path("/media/ep01.mkv")
-        audio_file = Path("/audio/ep01.mka")
         external_track = make_audio_track(
-            audio_file, language="rus", source=TrackSource.EXTERNAL
+            _AUDIO_EP01, language="rus", source=TrackSource.EXTERNAL
         )
-        ep = make_episode(1, video_file, external_audio={"RuDub": external_track})
+        ep = make_episode(1, _EP01, external_audio={"RuDub": external_track})
         analysis = make_analysis({1: ep})
         selection = make_selection(
-            audio_selections=[
-                TrackSelection(
-                    identifier="RuDub",
-                    is_embedded=False,
-                    display_name="RuDub",
-                )
-            ]
+            audio_selections=[make_track_selection("RuDub", False, "RuDub")]
         )
 
         result = _resolve_audio_tracks(ep, selection, analysis)
@@ -208,35 +339,22 @@ class TestResolveAudioTracks:
         assert result[0].source == TrackSource.EXTERNAL
 
     def test_resolve_multiple_audio_tracks(self):
-        video_file = Path("/media/ep01.mkv")
-        audio_file = Path("/audio/ep01.mka")
-
-        jpn_track = make_audio_track(
-            video_file, index=1, language="jpn", title="Japanese"
-        )
+        jpn_track = make_audio_track(_EP01, index=1, language="jpn", title="Japanese")
         external_track = make_audio_track(
-            audio_file, language="rus", source=TrackSource.EXTERNAL
+            _AUDIO_EP01, language="rus", source=TrackSource.EXTERNAL
         )
 
         ep = make_episode(
             1,
-            video_file,
+            _EP01,
             audio_tracks=[jpn_track],
             external_audio={"RuDub": external_track},
         )
         analysis = make_analysis({1: ep}, common_audio=[jpn_track.identity_key])
         selection = make_selection(
             audio_selections=[
-                TrackSelection(
-                    identifier=jpn_track.identity_key,
-                    is_embedded=True,
-                    display_name="Japanese",
-                ),
-                TrackSelection(
-                    identifier="RuDub",
-                    is_embedded=False,
-                    display_name="RuDub",
-                ),
+                make_track_selection(jpn_track.identity_key, True, "Japanese"),
+                make_track_selection("RuDub", False, "RuDub"),
             ]
         )
 
@@ -248,46 +366,31 @@ class TestResolveAudioTracks:
 
     def test_audio_substitution(self):
         """Test audio source substitution for missing episodes."""
-        video_file = Path("/media/ep01.mkv")
-        audio_file = Path("/audio/alt/ep01.mka")
-
         alt_track = make_audio_track(
-            audio_file, language="rus", source=TrackSource.EXTERNAL
+            _ALT_AUDIO_EP01, language="rus", source=TrackSource.EXTERNAL
         )
         ep = make_episode(
             1,
-            video_file,
+            _EP01,
             external_audio={"AltDub": alt_track},  # Main source missing, alt available
         )
         analysis = make_analysis({1: ep})
         selection = make_selection(
-            audio_selections=[
-                TrackSelection(
-                    identifier="MainDub",  # Requested but missing
-                    is_embedded=False,
-                    display_name="MainDub",
-                )
-            ],
+            # MainDub is requested but missing
+            audio_selections=[make_track_selection("MainDub", False, "MainDub")],
             audio_substitutions={1: "AltDub"},  # Substitute with AltDub
         )
 
         result = _resolve_audio_tracks(ep, selection, analysis)
 
         assert len(result) == 1
-        assert result[0].source_file == audio_file
+        assert result[0].source_file == _ALT_AUDIO_EP01
 
     def test_missing_external_source_returns_empty(self):
-        video_file = Path("/media/ep01.mkv")
-        ep = make_episode(1, video_file)
+        ep = make_episode(1, _EP01)
         analysis = make_analysis({1: ep})
         selection = make_selection(
-            audio_selections=[
-                TrackSelection(
-                    identifier="NonExistent",
-                    is_embedded=False,
-                    display_name="NonExistent",
-                )
-            ]
+            audio_selections=[make_track_selection("NonExistent", False, "NonExistent")]
         )
 
         result = _resolve_audio_tracks(ep, selection, analysis)
@@ -299,17 +402,12 @@ class TestResolveSubtitleTracks:
     """Tests for _resolve_subtitle_tracks function."""
 
     def test_resolve_embedded_subtitle(self):
-        video_file = Path("/media/ep01.mkv")
-        sub_track = make_sub_track(video_file, language="eng", title="English")
-        ep = make_episode(1, video_file, sub_tracks=[sub_track])
+        sub_track = make_sub_track(_EP01, language="eng", title="English")
+        ep = make_episode(1, _EP01, sub_tracks=[sub_track])
         analysis = make_analysis({1: ep}, common_subs=[sub_track.identity_key])
         selection = make_selection(
             subtitle_selections=[
-                TrackSelection(
-                    identifier=sub_track.identity_key,
-                    is_embedded=True,
-                    display_name="English",
-                )
+                make_track_selection(sub_track.identity_key, True, "English")
             ]
         )
 
@@ -319,21 +417,13 @@ class TestResolveSubtitleTracks:
         assert result[0].language == "eng"
 
     def test_resolve_external_subtitle(self):
-        video_file = Path("/media/ep01.mkv")
-        sub_file = Path("/subs/ep01.ass")
         external_sub = make_sub_track(
-            sub_file, language="rus", source=TrackSource.EXTERNAL
+            _SUB_EP01, language="rus", source=TrackSource.EXTERNAL
         )
-        ep = make_episode(1, video_file, external_subs={"RuSubs": external_sub})
+        ep = make_episode(1, _EP01, external_subs={"RuSubs": external_sub})
         analysis = make_analysis({1: ep})
         selection = make_selection(
-            subtitle_selections=[
-                TrackSelection(
-                    identifier="RuSubs",
-                    is_embedded=False,
-                    display_name="RuSubs",
-                )
-            ]
+            subtitle_selections=[make_track_selection("RuSubs", False, "RuSubs")]
         )
 
         result = _resolve_subtitle_tracks(ep, selection, analysis)
@@ -344,99 +434,55 @@ class TestResolveSubtitleTracks:
 
     def test_subtitle_substitution(self):
         """Test subtitle source substitution for missing episodes."""
-        video_file = Path("/media/ep01.mkv")
-        sub_file = Path("/subs/alt/ep01.ass")
-
-        alt_sub = make_sub_track(sub_file, language="eng", source=TrackSource.EXTERNAL)
+        alt_sub = make_sub_track(
+            _ALT_SUB_EP01, language="eng", source=TrackSource.EXTERNAL
+        )
         ep = make_episode(
             1,
-            video_file,
+            _EP01,
             external_subs={"AltSubs": alt_sub},
         )
         analysis = make_analysis({1: ep})
         selection = make_selection(
-            subtitle_selections=[
-                TrackSelection(
-                    identifier="MainSubs",
-                    is_embedded=False,
-                    display_name="MainSubs",
-                )
-            ],
+            subtitle_selections=[make_track_selection("MainSubs", False, "MainSubs")],
             subtitle_substitutions={1: "AltSubs"},
         )
 
         result = _resolve_subtitle_tracks(ep, selection, analysis)
 
         assert len(result) == 1
-        assert result[0].source_file == sub_file
+        assert result[0].source_file == _ALT_SUB_EP01
 
 
 class TestBuildMergePlan:
     """Tests for build_merge_plan function."""
 
-    def test_basic_merge_plan(self):
-        video_file = Path("/media/ep01.mkv")
-        audio_track = make_audio_track(video_file, language="jpn", title="Japanese")
-        sub_track = make_sub_track(video_file, language="eng", title="English")
-
-        ep = make_episode(
-            1, video_file, audio_tracks=[audio_track], sub_tracks=[sub_track]
-        )
-        analysis = make_analysis(
-            {1: ep},
-            common_audio=[audio_track.identity_key],
-            common_subs=[sub_track.identity_key],
-        )
-        selection = make_selection(
-            audio_selections=[
-                TrackSelection(
-                    identifier=audio_track.identity_key,
-                    is_embedded=True,
-                    display_name="Japanese",
-                )
-            ],
-            subtitle_selections=[
-                TrackSelection(
-                    identifier=sub_track.identity_key,
-                    is_embedded=True,
-                    display_name="English",
-                )
-            ],
-        )
-        output_dir = Path("/output")
-
-        plan = build_merge_plan(analysis, selection, output_dir)
+    @pytest.mark.parametrize("kwargs,expected", _PLAN_VARIANTS)
+    def test_plan_variants(self, kwargs, expected):
+        plan = plan_single_episode(**kwargs)
 
         assert len(plan.jobs) == 1
-        assert plan.output_directory == output_dir
-        assert plan.jobs[0].episode.number == 1
-        assert len(plan.jobs[0].video_tracks) == 1
-        assert len(plan.jobs[0].audio_tracks) == 1
-        assert len(plan.jobs[0].subtitle_tracks) == 1
-        assert plan.jobs[0].output_path == output_dir / "ep01.mkv"
+        assert plan.output_directory == _OUTPUT_DIR
+        job = describe_job(plan.jobs[0])
+        for field, value in expected.items():
+            assert job[field] == value, field
 
     def test_multiple_episodes(self):
         episodes = {}
         for i in range(1, 4):
-            video_file = Path(f"/media/ep{i:02d}.mkv")
-            audio = make_audio_track(video_file, language="jpn", title="Japanese")
-            episodes[i] = make_episode(i, video_file, audio_tracks=[audio])
+            audio = make_audio_track(_EP_FILES[i], language="jpn", title="Japanese")
+            episodes[i] = make_episode(i, _EP_FILES[i], audio_tracks=[audio])
 
         # All episodes have same audio identity
-        first_audio = list(episodes.values())[0].embedded_tracks[1]
+        first_audio = first_value(episodes).embedded_tracks[1]
         analysis = make_analysis(episodes, common_audio=[first_audio.identity_key])
         selection = make_selection(
             audio_selections=[
-                TrackSelection(
-                    identifier=first_audio.identity_key,
-                    is_embedded=True,
-                    display_name="Japanese",
-                )
+                make_track_selection(first_audio.identity_key, True, "Japanese")
             ]
         )
-        output_dir = Path("/output")
 
-        plan = build_merge_plan(analysis, selection, output_dir)
+        plan = build_merge_plan(analysis, selection, _OUTPUT_DIR)
 
         assert len(plan.jobs) == 3
         assert [j.episode.number for j in plan.jobs] == [1, 2, 3]
@@ -444,183 +490,41 @@ class TestBuildMergePlan:
     def test_skipped_episodes(self):
         episodes = {}
         for i in range(1, 4):
-            video_file = Path(f"/media/ep{i:02d}.mkv")
-            audio = make_audio_track(video_file, language="jpn", title="Japanese")
-            episodes[i] = make_episode(i, video_file, audio_tracks=[audio])
+            audio = make_audio_track(_EP_FILES[i], language="jpn", title="Japanese")
+            episodes[i] = make_episode(i, _EP_FILES[i], audio_tracks=[audio])
 
-        first_audio = list(episodes.values())[0].embedded_tracks[1]
+        first_audio = first_value(episodes).embedded_tracks[1]
         analysis = make_analysis(episodes, common_audio=[first_audio.identity_key])
         selection = make_selection(
             audio_selections=[
-                TrackSelection(
-                    identifier=first_audio.identity_key,
-                    is_embedded=True,
-                    display_name="Japanese",
-                )
+                make_track_selection(first_audio.identity_key, True, "Japanese")
             ],
             skipped_episodes=[2],
         )
-        output_dir = Path("/output")
 
-        plan = build_merge_plan(analysis, selection, output_dir)
+        plan = build_merge_plan(analysis, selection, _OUTPUT_DIR)
 
         assert len(plan.jobs) == 2
         assert [j.episode.number for j in plan.jobs] == [1, 3]
         assert 2 in plan.skipped_episodes
 
-    def test_preserve_attachments_default_true(self):
-        video_file = Path("/media/ep01.mkv")
-        audio_track = make_audio_track(video_file)
-        ep = make_episode(1, video_file, audio_tracks=[audio_track])
-        analysis = make_analysis({1: ep}, common_audio=[audio_track.identity_key])
-        selection = make_selection(
-            audio_selections=[
-                TrackSelection(
-                    identifier=audio_track.identity_key,
-                    is_embedded=True,
-                    display_name="Audio",
-                )
-            ]
-        )
-
-        plan = build_merge_plan(analysis, selection, Path("/output"))
-
-        assert plan.jobs[0].preserve_attachments is True
-
-    def test_output_path_preserves_filename(self):
-        video_file = Path("/media/[SubGroup] Series - 01 [1080p].mkv")
-        audio_track = make_audio_track(video_file)
-        ep = make_episode(1, video_file, audio_tracks=[audio_track])
-        analysis = make_analysis({1: ep}, common_audio=[audio_track.identity_key])
-        selection = make_selection(
-            audio_selections=[
-                TrackSelection(
-                    identifier=audio_track.identity_key,
-                    is_embedded=True,
-                    display_name="Audio",
-                )
-            ]
-        )
-        output_dir = Path("/output")
-
-        plan = build_merge_plan(analysis, selection, output_dir)
-
-        expected = output_dir / "[SubGroup] Series - 01 [1080p].mkv"
-        assert plan.jobs[0].output_path == expected
-
-    def test_external_audio_in_plan(self):
-        video_file = Path("/media/ep01.mkv")
-        audio_file = Path("/audio/ep01.mka")
-        external_track = make_audio_track(
-            audio_file, language="rus", source=TrackSource.EXTERNAL
-        )
-        ep = make_episode(1, video_file, external_audio={"RuDub": external_track})
-        analysis = make_analysis({1: ep})
-        selection = make_selection(
-            audio_selections=[
-                TrackSelection(
-                    identifier="RuDub",
-                    is_embedded=False,
-                    display_name="RuDub",
-                )
-            ]
-        )
-
-        plan = build_merge_plan(analysis, selection, Path("/output"))
-
-        assert len(plan.jobs[0].audio_tracks) == 1
-        assert plan.jobs[0].audio_tracks[0].source == TrackSource.EXTERNAL
-
-    def test_no_subtitles_selected(self):
-        video_file = Path("/media/ep01.mkv")
-        audio_track = make_audio_track(video_file)
-        sub_track = make_sub_track(video_file)
-        ep = make_episode(
-            1, video_file, audio_tracks=[audio_track], sub_tracks=[sub_track]
-        )
-        analysis = make_analysis(
-            {1: ep},
-            common_audio=[audio_track.identity_key],
-            common_subs=[sub_track.identity_key],
-        )
-        selection = make_selection(
-            audio_selections=[
-                TrackSelection(
-                    identifier=audio_track.identity_key,
-                    is_embedded=True,
-                    display_name="Audio",
-                )
-            ],
-            subtitle_selections=[],  # No subtitles selected
-        )
-
-        plan = build_merge_plan(analysis, selection, Path("/output"))
-
-        assert plan.jobs[0].subtitle_tracks == []
-
     def test_jobs_sorted_by_episode_number(self):
         # Create episodes out of order
         episodes = {}
         for i in [3, 1, 2]:
-            video_file = Path(f"/media/ep{i:02d}.mkv")
-            audio = make_audio_track(video_file, language="jpn", title="Japanese")
-            episodes[i] = make_episode(i, video_file, audio_tracks=[audio])
+            audio = make_audio_track(_EP_FILES[i], language="jpn", title="Japanese")
+            episodes[i] = make_episode(i, _EP_FILES[i], audio_tracks=[audio])
 
-        first_audio = list(episodes.values())[0].embedded_tracks[1]
+        first_audio = first_value(episodes).embedded_tracks[1]
         analysis = make_analysis(episodes, common_audio=[first_audio.identity_key])
         selection = make_selection(
             audio_selections=[
-                TrackSelection(
-                    identifier=first_audio.identity_key,
-                    is_embedded=True,
-                    display_name="Japanese",
-                )
+                make_track_selection(first_audio.identity_key, True, "Japanese")
             ]
         )
 
-        plan = build_merge_plan(analysis, selection, Path("/output"))
+        plan = build_merge_plan(analysis, selection, _OUTPUT_DIR)
 
         # Jobs should be sorted
         episode_numbers = [j.episode.number for j in plan.jobs]
         assert episode_numbers == [1, 2, 3]
-
-    def test_mixed_embedded_and_external(self):
-        """Test plan with both embedded audio and external subtitles."""
-        video_file = Path("/media/ep01.mkv")
-        sub_file = Path("/subs/ep01.ass")
-
-        audio_track = make_audio_track(video_file, language="jpn", title="Japanese")
-        external_sub = make_sub_track(
-            sub_file, language="eng", source=TrackSource.EXTERNAL
-        )
-
-        ep = make_episode(
-            1,
-            video_file,
-            audio_tracks=[audio_track],
-            external_subs={"EngSubs": external_sub},
-        )
-        analysis = make_analysis({1: ep}, common_audio=[audio_track.identity_key])
-        selection = make_selection(
-            audio_selections=[
-                TrackSelection(
-                    identifier=audio_track.identity_key,
-                    is_embedded=True,
-                    display_name="Japanese",
-                )
-            ],
-            subtitle_selections=[
-                TrackSelection(
-                    identifier="EngSubs",
-                    is_embedded=False,
-                    display_name="EngSubs",
-                )
-            ],
-        )
-
-        plan = build_merge_plan(analysis, selection, Path("/output"))
-
-        assert len(plan.jobs[0].audio_tracks) == 1
-        assert plan.jobs[0].audio_tracks[0].source == TrackSource.EMBEDDED
-        assert len(plan.jobs[0].subtitle_tracks) == 1
-        assert plan.jobs[0].subtitle_tracks[0].source == TrackSource.EXTERNAL
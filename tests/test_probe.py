@@ -1,205 +1,384 @@
 """Tests for probe module."""
 
+from operator import attrgetter
 from pathlib import Path
 
-from anime_mux.models import TrackSource, TrackType
-from anime_mux.probe import _get_tag, parse_tracks
-
-
-class TestGetTag:
-    """Tests for _get_tag helper function."""
+import pytest
+
+from anime_mux import probe
+from anime_mux.models import Track, TrackSource, TrackType
+from anime_mux.probe import (
+    _get_lowered_tag,
+    _lowercase_tags,
+    parse_tracks,
+    probe_file,
+)
+
+_TEST_PATH = Path("/test/video.mkv")
+
+# ffprobe payloads shared by the parse tests; treat as read-only
+_PROBE_FIXTURES: dict[str, dict] = {
+    "video": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "tags": {},
+                "disposition": {"default": 1, "forced": 0},
+            }
+        ]
+    },
+    "audio": {
+        "streams": [
+            {
+                "index": 1,
+                "codec_type": "audio",
+                "codec_name": "aac",
+                "channels": 2,
+                "tags": {"language": "jpn", "title": "Japanese"},
+                "disposition": {"default": 1, "forced": 0},
+            }
+        ]
+    },
+    "subtitle": {
+        "streams": [
+            {
+                "index": 2,
+                "codec_type": "subtitle",
+                "codec_name": "ass",
+                "tags": {"language": "eng", "title": "English Subtitles"},
+                "disposition": {"default": 0, "forced": 1},
+            }
+        ]
+    },
+    "mixed": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "tags": {},
+                "disposition": {},
+            },
+            {
+                "index": 1,
+                "codec_type": "audio",
+                "codec_name": "aac",
+                "channels": 2,
+                "tags": {"language": "jpn"},
+                "disposition": {},
+            },
+            {
+                "index": 2,
+                "codec_type": "audio",
+                "codec_name": "ac3",
+                "channels": 6,
+                "tags": {"language": "eng"},
+                "disposition": {},
+            },
+            {
+                "index": 3,
+                "codec_type": "subtitle",
+                "codec_name": "srt",
+                "tags": {"language": "eng"},
+                "disposition": {},
+            },
+        ]
+    },
+    "audio_mixed_case_tags": {
+        "streams": [
+            {
+                "index": 1,
+                "codec_type": "audio",
+                "codec_name": "aac",
+                "tags": {"Language": "jpn", "TITLE": "Japanese"},
+                "disposition": {},
+            }
+        ]
+    },
+    "audio_no_language": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "audio",
+                "codec_name": "aac",
+                "tags": {},
+                "disposition": {},
+            }
+        ]
+    },
+    "video_and_data": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "tags": {},
+                "disposition": {},
+            },
+            {
+                "index": 1,
+                "codec_type": "data",
+                "codec_name": "bin_data",
+                "tags": {},
+                "disposition": {},
+            },
+        ]
+    },
+    "empty": {"streams": []},
+    "no_streams": {},
+    "video_1080p": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "width": 1920,
+                "height": 1080,
+                "tags": {},
+                "disposition": {},
+            }
+        ]
+    },
+    "video_stream_bitrate": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "width": 1920,
+                "height": 1080,
+                "bit_rate": "8000000",
+                "tags": {},
+                "disposition": {},
+            }
+        ]
+    },
+    "video_format_bitrate": {
+        "format": {"bit_rate": "10000000"},
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "width": 1920,
+                "height": 1080,
+                "tags": {},
+                "disposition": {},
+            }
+        ],
+    },
+    "video_int_bitrate": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "width": 1920,
+                "height": 1080,
+                "bit_rate": 8000000,
+                "tags": {},
+                "disposition": {},
+            }
+        ]
+    },
+    "video_int_format_bitrate": {
+        "format": {"bit_rate": 10000000},
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "width": 1920,
+                "height": 1080,
+                "tags": {},
+                "disposition": {},
+            }
+        ],
+    },
+    "video_both_bitrates": {
+        "format": {"bit_rate": "20000000"},
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "width": 1920,
+                "height": 1080,
+                "bit_rate": "8000000",
+                "tags": {},
+                "disposition": {},
+            }
+        ],
+    },
+    "video_no_bitrate": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "width": 1920,
+                "height": 1080,
+                "tags": {},
+                "disposition": {},
+            }
+        ]
+    },
+    "audio_untagged": {
+        "streams": [
+            {
+                "index": 1,
+                "codec_type": "audio",
+                "codec_name": "aac",
+                "channels": 2,
+                "tags": {},
+                "disposition": {},
+            }
+        ]
+    },
+    "video_invalid_bitrate": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "h264",
+                "width": 1920,
+                "height": 1080,
+                "bit_rate": "N/A",
+                "tags": {},
+                "disposition": {},
+            }
+        ],
+        "format": {"bit_rate": "5000000"},
+    },
+    "video_4k": {
+        "streams": [
+            {
+                "index": 0,
+                "codec_type": "video",
+                "codec_name": "hevc",
+                "width": 3840,
+                "height": 2160,
+                "bit_rate": "20000000",
+                "tags": {},
+                "disposition": {},
+            }
+        ]
+    },
+}
+
+
+# parse_tracks is pure and Track is frozen, so each payload requested
+# through this fixture is parsed once per session and shared read-only
+@pytest.fixture(scope="session")
+def parsed_tracks(request: pytest.FixtureRequest) -> list[Track]:
+    """Tracks parsed from _PROBE_FIXTURES[request.param]."""
+    return parse_tracks(_PROBE_FIXTURES[request.param], _TEST_PATH)
+
+
+# Fields compared by the table-driven parse test, in this order
+_track_fields = attrgetter(
+    "index",
+    "track_type",
+    "codec",
+    "language",
+    "title",
+    "source",
+    "channels",
+    "is_forced",
+    "is_default",
+)
+_V, _A, _S = TrackType.VIDEO, TrackType.AUDIO, TrackType.SUBTITLE
+_EMB = TrackSource.EMBEDDED
+
+
+class TestGetLoweredTag:
+    """Tests for _get_lowered_tag on _lowercase_tags output."""
 
     def test_exact_match(self):
-        tags = {"language": "eng"}
-        assert _get_tag(tags, "language") == "eng"
+        tags = _lowercase_tags({"language": "eng"})
+        assert _get_lowered_tag(tags, ("language",)) == "eng"
 
     def test_uppercase_match(self):
-        tags = {"LANGUAGE": "eng"}
-        assert _get_tag(tags, "language") == "eng"
+        tags = _lowercase_tags({"LANGUAGE": "eng"})
+        assert _get_lowered_tag(tags, ("language",)) == "eng"
 
-    def test_lowercase_match(self):
-        tags = {"language": "eng"}
-        assert _get_tag(tags, "LANGUAGE") == "eng"
+    def test_mixed_case_match(self):
+        tags = _lowercase_tags({"Language": "eng"})
+        assert _get_lowered_tag(tags, ("language",)) == "eng"
+
+    def test_first_spelling_wins(self):
+        tags = _lowercase_tags({"language": "eng", "LANGUAGE": "jpn"})
+        assert _get_lowered_tag(tags, ("language",)) == "eng"
 
     def test_first_key_priority(self):
-        tags = {"language": "eng", "lang": "jpn"}
-        assert _get_tag(tags, "language", "lang") == "eng"
+        tags = _lowercase_tags({"language": "eng", "lang": "jpn"})
+        assert _get_lowered_tag(tags, ("language", "lang")) == "eng"
 
     def test_fallback_key(self):
-        tags = {"lang": "jpn"}
-        assert _get_tag(tags, "language", "lang") == "jpn"
+        tags = _lowercase_tags({"lang": "jpn"})
+        assert _get_lowered_tag(tags, ("language", "lang")) == "jpn"
 
     def test_not_found(self):
-        tags = {"other": "value"}
-        assert _get_tag(tags, "language", "lang") is None
+        tags = _lowercase_tags({"other": "value"})
+        assert _get_lowered_tag(tags, ("language", "lang")) is None
 
     def test_empty_tags(self):
-        assert _get_tag({}, "language") is None
+        assert _get_lowered_tag({}, ("language", "lang")) is None
 
 
 class TestParseTracks:
     """Tests for parse_tracks function."""
 
-    def test_parse_video_track(self):
-        probe_data = {
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "h264",
-                    "tags": {},
-                    "disposition": {"default": 1, "forced": 0},
-                }
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+    @pytest.mark.parametrize(
+        "parsed_tracks,expected",
+        [
+            ("video", [(0, _V, "h264", "und", None, _EMB, None, False, True)]),
+            ("audio", [(1, _A, "aac", "jpn", "Japanese", _EMB, 2, False, True)]),
+            (
+                "subtitle",
+                [(2, _S, "ass", "eng", "English Subtitles", _EMB, None, True, False)],
+            ),
+            (
+                "mixed",
+                [
+                    (0, _V, "h264", "und", None, _EMB, None, False, False),
+                    (1, _A, "aac", "jpn", None, _EMB, 2, False, False),
+                    (2, _A, "ac3", "eng", None, _EMB, 6, False, False),
+                    (3, _S, "srt", "eng", None, _EMB, None, False, False),
+                ],
+            ),
+        ],
+        indirect=["parsed_tracks"],
+    )
+    def test_parse(self, parsed_tracks, expected):
+        assert [_track_fields(t) for t in parsed_tracks] == expected
+
+    def test_mixed_case_tag_keys(self):
+        """Tag keys match regardless of the container's capitalization."""
+        tracks = parse_tracks(_PROBE_FIXTURES["audio_mixed_case_tags"], _TEST_PATH)
 
-        assert len(tracks) == 1
-        assert tracks[0].index == 0
-        assert tracks[0].track_type == TrackType.VIDEO
-        assert tracks[0].codec == "h264"
-        assert tracks[0].source == TrackSource.EMBEDDED
-
-    def test_parse_audio_track(self):
-        probe_data = {
-            "streams": [
-                {
-                    "index": 1,
-                    "codec_type": "audio",
-                    "codec_name": "aac",
-                    "channels": 2,
-                    "tags": {"language": "jpn", "title": "Japanese"},
-                    "disposition": {"default": 1, "forced": 0},
-                }
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
-
-        assert len(tracks) == 1
-        assert tracks[0].index == 1
-        assert tracks[0].track_type == TrackType.AUDIO
-        assert tracks[0].codec == "aac"
         assert tracks[0].language == "jpn"
         assert tracks[0].title == "Japanese"
-        assert tracks[0].channels == 2
-        assert tracks[0].is_default is True
-
-    def test_parse_subtitle_track(self):
-        probe_data = {
-            "streams": [
-                {
-                    "index": 2,
-                    "codec_type": "subtitle",
-                    "codec_name": "ass",
-                    "tags": {"language": "eng", "title": "English Subtitles"},
-                    "disposition": {"default": 0, "forced": 1},
-                }
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
-
-        assert len(tracks) == 1
-        assert tracks[0].index == 2
-        assert tracks[0].track_type == TrackType.SUBTITLE
-        assert tracks[0].codec == "ass"
-        assert tracks[0].language == "eng"
-        assert tracks[0].is_forced is True
-        assert tracks[0].is_default is False
-
-    def test_parse_multiple_tracks(self):
-        probe_data = {
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "h264",
-                    "tags": {},
-                    "disposition": {},
-                },
-                {
-                    "index": 1,
-                    "codec_type": "audio",
-                    "codec_name": "aac",
-                    "channels": 2,
-                    "tags": {"language": "jpn"},
-                    "disposition": {},
-                },
-                {
-                    "index": 2,
-                    "codec_type": "audio",
-                    "codec_name": "ac3",
-                    "channels": 6,
-                    "tags": {"language": "eng"},
-                    "disposition": {},
-                },
-                {
-                    "index": 3,
-                    "codec_type": "subtitle",
-                    "codec_name": "srt",
-                    "tags": {"language": "eng"},
-                    "disposition": {},
-                },
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
-
-        assert len(tracks) == 4
-        assert tracks[0].track_type == TrackType.VIDEO
-        assert tracks[1].track_type == TrackType.AUDIO
-        assert tracks[1].language == "jpn"
-        assert tracks[2].track_type == TrackType.AUDIO
-        assert tracks[2].language == "eng"
-        assert tracks[2].channels == 6
-        assert tracks[3].track_type == TrackType.SUBTITLE
 
     def test_unknown_language_defaults_to_und(self):
-        probe_data = {
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "audio",
-                    "codec_name": "aac",
-                    "tags": {},
-                    "disposition": {},
-                }
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["audio_no_language"], _TEST_PATH)
 
         assert tracks[0].language == "und"
 
     def test_ignores_data_streams(self):
-        probe_data = {
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "h264",
-                    "tags": {},
-                    "disposition": {},
-                },
-                {
-                    "index": 1,
-                    "codec_type": "data",
-                    "codec_name": "bin_data",
-                    "tags": {},
-                    "disposition": {},
-                },
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["video_and_data"], _TEST_PATH)
 
         assert len(tracks) == 1
         assert tracks[0].track_type == TrackType.VIDEO
 
     def test_empty_streams(self):
-        probe_data = {"streams": []}
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["empty"], _TEST_PATH)
         assert tracks == []
 
     def test_no_streams_key(self):
-        probe_data = {}
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["no_streams"], _TEST_PATH)
         assert tracks == []
 
 
@@ -208,20 +387,7 @@ class TestVideoMetadataExtraction:
 
     def test_parse_video_dimensions(self):
         """Video tracks have width and height extracted."""
-        probe_data = {
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "h264",
-                    "width": 1920,
-                    "height": 1080,
-                    "tags": {},
-                    "disposition": {},
-                }
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["video_1080p"], _TEST_PATH)
 
         assert len(tracks) == 1
         assert tracks[0].width == 1920
@@ -229,99 +395,42 @@ class TestVideoMetadataExtraction:
 
     def test_parse_video_bitrate_from_stream(self):
         """Video bitrate extracted from stream when available."""
-        probe_data = {
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "h264",
-                    "width": 1920,
-                    "height": 1080,
-                    "bit_rate": "8000000",
-                    "tags": {},
-                    "disposition": {},
-                }
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["video_stream_bitrate"], _TEST_PATH)
 
         assert tracks[0].bitrate == 8000000
 
     def test_parse_video_bitrate_fallback_to_format(self):
         """Video bitrate falls back to format level when stream has none."""
-        probe_data = {
-            "format": {"bit_rate": "10000000"},
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "h264",
-                    "width": 1920,
-                    "height": 1080,
-                    "tags": {},
-                    "disposition": {},
-                }
-            ],
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["video_format_bitrate"], _TEST_PATH)
+
+        assert tracks[0].bitrate == 10000000
+
+    def test_parse_video_integer_bitrates(self):
+        """Integer bit_rate values are accepted at stream and format level."""
+        tracks = parse_tracks(_PROBE_FIXTURES["video_int_bitrate"], _TEST_PATH)
+        assert tracks[0].bitrate == 8000000
 
+        tracks = parse_tracks(_PROBE_FIXTURES["video_int_format_bitrate"], _TEST_PATH)
         assert tracks[0].bitrate == 10000000
 
     def test_parse_video_stream_bitrate_preferred_over_format(self):
         """Stream-level bitrate is preferred over format-level."""
-        probe_data = {
-            "format": {"bit_rate": "20000000"},
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "h264",
-                    "width": 1920,
-                    "height": 1080,
-                    "bit_rate": "8000000",
-                    "tags": {},
-                    "disposition": {},
-                }
-            ],
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(
+            _PROBE_FIXTURES["video_both_bitrates"],
+            _TEST_PATH,
+        )
 
         assert tracks[0].bitrate == 8000000
 
     def test_parse_video_no_bitrate(self):
         """Video bitrate is None when unavailable."""
-        probe_data = {
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "h264",
-                    "width": 1920,
-                    "height": 1080,
-                    "tags": {},
-                    "disposition": {},
-                }
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["video_no_bitrate"], _TEST_PATH)
 
         assert tracks[0].bitrate is None
 
     def test_audio_track_no_video_metadata(self):
         """Audio tracks don't have video metadata populated."""
-        probe_data = {
-            "streams": [
-                {
-                    "index": 1,
-                    "codec_type": "audio",
-                    "codec_name": "aac",
-                    "channels": 2,
-                    "tags": {},
-                    "disposition": {},
-                }
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["audio_untagged"], _TEST_PATH)
 
         assert tracks[0].width is None
         assert tracks[0].height is None
@@ -329,44 +438,64 @@ class TestVideoMetadataExtraction:
 
     def test_parse_invalid_bitrate_string(self):
         """Invalid bitrate string gracefully handled."""
-        probe_data = {
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "h264",
-                    "width": 1920,
-                    "height": 1080,
-                    "bit_rate": "N/A",
-                    "tags": {},
-                    "disposition": {},
-                }
-            ],
-            "format": {"bit_rate": "5000000"},
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["video_invalid_bitrate"], _TEST_PATH)
 
         # Falls back to format bitrate
         assert tracks[0].bitrate == 5000000
 
     def test_parse_4k_video(self):
         """4K video dimensions are parsed correctly."""
-        probe_data = {
-            "streams": [
-                {
-                    "index": 0,
-                    "codec_type": "video",
-                    "codec_name": "hevc",
-                    "width": 3840,
-                    "height": 2160,
-                    "bit_rate": "20000000",
-                    "tags": {},
-                    "disposition": {},
-                }
-            ]
-        }
-        tracks = parse_tracks(probe_data, Path("/test/video.mkv"))
+        tracks = parse_tracks(_PROBE_FIXTURES["video_4k"], _TEST_PATH)
 
         assert tracks[0].width == 3840
         assert tracks[0].height == 2160
         assert tracks[0].bitrate == 20000000
+
+
+class TestProbeFileCache:
+    """Tests for probe_file result caching."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Start and finish each test with an empty probe cache."""
+        probe._probe_file_cached.cache_clear()
+        yield
+        probe._probe_file_cached.cache_clear()
+
+    @pytest.fixture
+    def ffprobe_calls(self, monkeypatch):
+        """Replace _run_ffprobe with a stub; returns the probed paths."""
+        calls: list[Path] = []
+
+        def fake_run_ffprobe(file_path: Path) -> dict:
+            calls.append(file_path)
+            return {"streams": []}
+
+        monkeypatch.setattr(probe, "_run_ffprobe", fake_run_ffprobe)
+        return calls
+
+    def test_unchanged_file_probed_once(self, tmp_path, ffprobe_calls):
+        media = tmp_path / "ep01.mkv"
+        media.write_bytes(b"x")
+
+        assert probe_file(media) == {"streams": []}
+        assert probe_file(media) == {"streams": []}
+        assert len(ffprobe_calls) == 1
+
+    def test_modified_file_probed_again(self, tmp_path, ffprobe_calls):
+        media = tmp_path / "ep01.mkv"
+        media.write_bytes(b"x")
+        probe_file(media)
+
+        media.write_bytes(b"longer")
+        probe_file(media)
+
+        assert len(ffprobe_calls) == 2
+
+    def test_missing_file_not_cached(self, tmp_path, ffprobe_calls):
+        missing = tmp_path / "missing.mkv"
+
+        probe_file(missing)
+        probe_file(missing)
+
+        assert len(ffprobe_calls) == 2